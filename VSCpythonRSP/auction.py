@@ -1,22 +1,253 @@
+import collections
+import functools
+import heapq
 import random
+import settings
 from cards import Card
+from protocol import CARD_TYPES
+
+
+def resolve_sealed_bids(bids, mode="first", reserve=0, priority=0):
+    """
+    봉인 입찰(sealed-bid) 결과 계산 (N명 공용):
+    - bids: 좌석 순서대로의 입찰 금액 리스트 (0 이하나 최소 입찰가 reserve 미만은 입찰 포기로 처리)
+    - mode: "first" → 낙찰자가 자신의 입찰가를 지불,
+            "second" → 낙찰자가 차순위 입찰가를 지불 (비크리 경매, 차순위가 없거나 낮으면 reserve)
+    - 동률은 priority번 좌석부터 순서대로 우선권을 주어 결정적으로 처리합니다.
+      (라운드 번호를 넘기면 우선권이 매 라운드 한 칸씩 돌아갑니다.)
+    - 전체 정렬 없이 힙으로 상위 두 명만 골라내므로 O(N)입니다.
+    반환값: (낙찰 좌석, 지불 금액) / 유효한 입찰이 없으면 (None, 0)
+    """
+    if mode not in ("first", "second"):
+        raise ValueError(f"알 수 없는 경매 방식입니다: {mode}")
+
+    n = len(bids)
+    top = heapq.nsmallest(
+        2, ((-bid, (seat - priority) % n, seat) for seat, bid in enumerate(bids)
+            if bid > 0 and bid >= reserve)
+    )
+    if not top:
+        return None, 0
+
+    winner_bid = -top[0][0]
+    winner = top[0][2]
+    if mode == "first":
+        return winner, winner_bid
+
+    runner_up_bid = -top[1][0] if len(top) > 1 else 0
+    # 유효한 입찰은 모두 reserve 이상이므로 지불 금액은 낙찰자의 입찰가를 넘지 않음
+    return winner, max(runner_up_bid, reserve)
+
+
+def resolve_batch_bids(bid_vectors, mode="first", reserve=0, priority=0):
+    """
+    묶음 경매 결과 계산:
+    - bid_vectors: 좌석 순서대로 로트(경매 카드)별 입찰 금액 리스트 (모두 같은 길이)
+    - 로트마다 resolve_sealed_bids로 따로 정산하고, 동률 우선권은 로트마다 한 칸씩 더 돌립니다.
+    - 입찰 합계가 보유 포인트 이하인지는 부르는 쪽에서 확인합니다.
+      지불 금액은 입찰가를 넘지 않으므로 여러 로트를 낙찰받아도 포인트가 모자라지 않습니다.
+    반환값: 로트별 (낙찰 좌석, 지불 금액) 리스트
+    """
+    lots = len(bid_vectors[0]) if bid_vectors else 0
+    return [resolve_sealed_bids([bids[lot] for bids in bid_vectors], mode, reserve, priority + lot)
+            for lot in range(lots)]
+
+
+def round_robin_pairings(seats):
+    """
+    라운드 로빈 대진표 생성 (서클 방식):
+    - 모든 좌석이 서로 한 번씩 만나도록 라운드별 (좌석, 좌석) 쌍 리스트를 반환합니다.
+    - 인원이 홀수면 라운드마다 한 명이 부전(bye)으로 쉬게 됩니다.
+    """
+    seats = list(seats)
+    if len(seats) % 2:
+        seats.append(None)
+    n = len(seats)
+    rounds = []
+    for _ in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            a, b = seats[i], seats[n - 1 - i]
+            if a is not None and b is not None:
+                pairs.append((a, b))
+        rounds.append(pairs)
+        # 첫 좌석은 고정하고 나머지를 한 칸씩 회전
+        seats = [seats[0], seats[-1]] + seats[1:-1]
+    return rounds
+
+
+class AliasTable:
+    """
+    별칭(alias) 표 (Vose 방식):
+    - 가중치 n개로 O(n)에 표를 한 번 만들어 두면, 이후 한 번 뽑을 때마다 O(1)입니다.
+    - 난수 하나의 정수 부분으로 칸을 고르고, 소수 부분으로 그 칸의 원래 값/별칭 값을 고릅니다.
+    """
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("가중치가 비어 있거나 합이 0입니다.")
+
+        scaled = [w * n / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # 남은 칸은 부동소수점 오차만 있으므로 확률 1로 둠
+
+    @classmethod
+    def from_arrays(cls, prob, alias):
+        """미리 계산해 둔 표(rulecache의 mmap 배열 등)를 그대로 씀"""
+        table = cls.__new__(cls)
+        table.prob = prob
+        table.alias = alias
+        return table
+
+    def draw(self, rng=random):
+        u = rng.random() * len(self.prob)
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+    def draw_batch(self, count, rng=random):
+        """count개를 한 번에 뽑아 인덱스 리스트로 반환"""
+        prob, alias, rand = self.prob, self.alias, rng.random
+        n = len(prob)
+        out = []
+        append = out.append
+        for _ in range(count):
+            u = rand() * n
+            i = int(u)
+            append(i if u - i < prob[i] else alias[i])
+        return out
+
+
+class AuctionDeck:
+    """
+    경매 덱:
+    - 설정의 가중치/희귀도를 (카드, 희귀도) 항목 목록으로 펼치고 항목마다 Card 객체를 하나씩 만들어 둡니다.
+      경매 카드는 이 객체를 그대로 돌려주므로 수천 장을 뽑아도 새 객체를 만들지 않습니다.
+    - 복원 추출 덱은 별칭 표로 O(1)에 뽑고, 비복원 추출 덱은 new_pile()로 섞은 더미를 방마다 따로 가집니다.
+    - 덱 자체는 바뀌지 않으므로 같은 이름의 덱은 모든 방이 함께 씁니다. (load_deck 참고)
+    """
+    def __init__(self, weights, tiers=None, replacement=True, name=None, table=None):
+        self.name = name
+        self.replacement = replacement
+        entries = []
+        if tiers:
+            for tier, tier_weight in tiers.items():
+                tier_cards = weights[tier]
+                tier_total = sum(tier_cards.values())
+                for card, weight in tier_cards.items():
+                    share = weight if not replacement else tier_weight * weight / tier_total
+                    entries.append((card, tier, share))
+        else:
+            entries = [(card, None, weight) for card, weight in weights.items()]
+        # 카드 장수 인코딩과 상성표는 CARD_TYPES의 카드만 알고 있음
+        unknown = sorted({card for card, _, _ in entries} - set(CARD_TYPES))
+        if unknown:
+            raise ValueError(f"알 수 없는 카드입니다: {', '.join(unknown)} "
+                             f"(사용할 수 있는 카드: {', '.join(CARD_TYPES)})")
+
+        self.lots = [Card(card, tier) for card, tier, _ in entries]
+        self.lot_index = {lot: i for i, lot in enumerate(self.lots)}
+        self.weights = [weight for _, _, weight in entries]
+        if replacement:
+            self.table = table if table is not None else AliasTable(self.weights)
+        else:
+            self.table = None
+            if any(weight != int(weight) or weight < 0 for weight in self.weights):
+                raise ValueError("비복원 추출 덱의 가중치는 장수(0 이상의 정수)여야 합니다.")
+
+    def check_replacement(self):
+        """비복원 추출 덱은 방마다 더미가 따로 있으므로 공유하는 덱에서 바로 뽑을 수 없음"""
+        if self.table is None:
+            raise ValueError(f"비복원 추출 덱({self.name})은 바로 뽑을 수 없습니다. "
+                             f"new_pile()로 더미를 만들어 쓰세요.")
+
+    def draw(self, rng=random):
+        self.check_replacement()
+        return self.lots[self.table.draw(rng)]
+
+    def draw_batch(self, count, rng=random):
+        """복원 추출로 경매 카드 count장을 한 번에 뽑음 (시뮬레이터, 방의 미리 뽑기용)"""
+        self.check_replacement()
+        lots = self.lots
+        return [lots[i] for i in self.table.draw_batch(count, rng)]
+
+    def new_pile(self, rng=random):
+        """비복원 추출용: 장수만큼 항목 인덱스를 펼쳐 섞은 더미 (끝에서부터 꺼내 씀)"""
+        pile = [i for i, weight in enumerate(self.weights) for _ in range(int(weight))]
+        rng.shuffle(pile)
+        return pile
+
+
+@functools.lru_cache(maxsize=None)
+def load_deck(name):
+    """
+    settings.AUCTION_DECKS의 덱을 만들어 캐시 (모든 방이 같은 객체를 공유)
+    별칭 표는 규칙 캐시 파일(rulecache.py)이 있으면 계산하지 않고 그대로 씀
+    """
+    import rulecache
+    if name not in settings.AUCTION_DECKS:
+        raise ValueError(f"알 수 없는 경매 덱입니다: {name}")
+    config = settings.AUCTION_DECKS[name]
+    cache = rulecache.load()
+    table = None
+    if cache is not None and name in cache.tables:
+        table = AliasTable.from_arrays(*cache.tables[name])
+    return AuctionDeck(config["weights"], config.get("tiers"),
+                       config.get("replacement", True), name, table)
+
 
 class Auction:
     """
     경매 시스템 클래스:
-    - 경매에 참가할 카드(예: "특별 가위", "특별 바위", "특별 보")를 랜덤으로 선택합니다.
+    - 경매에 참가할 카드(예: "특별 가위", "특별 바위", "특별 보")를 설정된 덱에서 가중치에 따라 뽑습니다.
     - 플레이어는 직접 입찰 금액을 입력하고, 
-      AI는 100 ~ 500 포인트 범위 내에서 랜덤하게 입찰합니다.
+      AI는 100 ~ 500 포인트 범위 내에서 랜덤하게 입찰합니다. (AI는 여러 명이어도 됩니다.)
     - 입찰 금액은 낙찰한 쪽에만 차감됩니다.
+      (mode="second"이면 낙찰자는 차순위 입찰가만 지불합니다.)
     - 경매 전에 현재 경매에 올라간 카드가 무엇인지 출력됩니다.
     """
-    def __init__(self):
-        self.auction_cards = ["가위", "바위", "보"]
+    def __init__(self, mode="first", deck=None):
+        self.mode = mode
+        self.round = 0
+        self.deck = deck or load_deck(settings.AUCTION_DECK)
+        # 비복원 추출 덱이면 이 경매만의 더미를 가짐
+        self.pile = None if self.deck.replacement else self.deck.new_pile()
+        self.upcoming = collections.deque()  # 미리 뽑아 둔 경매 카드
+
+    def draw_lots(self, count):
+        """경매 카드 count장을 뽑음 (비복원 덱이 바닥나면 더 적게 나올 수 있음)"""
+        if self.pile is None:
+            return self.deck.draw_batch(count)
+        taken = self.pile[-count:]
+        del self.pile[-count:]
+        return [self.deck.lots[i] for i in reversed(taken)]
 
-    def collect_bids(self, player, ai):
-        # 경매에 올라갈 카드를 랜덤 선택 후 출력
-        current_card = random.choice(self.auction_cards)
-        print(f"\n-- 경매 카드 공개: {current_card} --")
+    def get_current_card(self):
+        """
+        이번 경매에 올라갈 카드를 Card 객체로 반환 (덱이 바닥나면 None).
+        LOT_PREFETCH장씩 미리 뽑아 두고 하나씩 꺼냅니다.
+        """
+        if not self.upcoming:
+            self.upcoming.extend(self.draw_lots(settings.LOT_PREFETCH))
+        return self.upcoming.popleft() if self.upcoming else None
+
+    def collect_bids(self, player, *ais):
+        # 경매에 올라갈 카드를 덱에서 뽑은 후 출력
+        lot = self.get_current_card()
+        if lot is None:
+            print("\n경매 카드가 모두 소진되었습니다.")
+            return
+        current_card = lot.name
+        print(f"\n-- 경매 카드 공개: {current_card}{f' ({lot.tier})' if lot.tier else ''} --")
         
         # 플레이어 입찰: 최소 100 포인트 이상, 현재 포인트 이하여야 함.
         try:
@@ -31,27 +262,32 @@ class Auction:
             # 입찰 금액은 여기서 차감하지 않고, 낙찰 결과에 따라 차감합니다.
             print(f"{player.name}가 {bid_player} 포인트로 입찰했습니다.")
 
+        bidders = [player]
+        bids = [bid_player]
+
         # AI 입찰: 남은 포인트가 있으면 100 ~ 500 범위 내에서 입찰 (단, AI가 가진 포인트보다 클 경우 AI의 포인트만 사용)
-        if ai.points >= 100:
-            bid_ai = random.randint(100, 500)
-            bid_ai = min(bid_ai, ai.points)
-            print(f"{ai.name}가 {bid_ai} 포인트로 입찰했습니다.")
-        else:
-            bid_ai = 0
-            print(f"{ai.name}은(는) 입찰할 포인트가 부족합니다.")
-
-        # 입찰 결과 결정
-        if bid_player == bid_ai:
-            print("입찰이 동률입니다. 경매가 무효 처리되어 카드 획득은 없습니다.")
-        elif bid_player > bid_ai:
-            # 플레이어가 낙찰 시 입찰 금액만큼 포인트 차감 및 카드 획득
-            player.points -= bid_player
-            player.add_card(Card(current_card))
-            print(f"{player.name}가 {current_card} 카드를 낙찰 받았습니다!")
+        for ai in ais:
+            if ai.points >= 100:
+                bid_ai = random.randint(100, 500)
+                bid_ai = min(bid_ai, ai.points)
+                print(f"{ai.name}가 {bid_ai} 포인트로 입찰했습니다.")
+            else:
+                bid_ai = 0
+                print(f"{ai.name}은(는) 입찰할 포인트가 부족합니다.")
+            bidders.append(ai)
+            bids.append(bid_ai)
+
+        # 입찰 결과 결정 (동률은 라운드마다 돌아가는 좌석 우선권으로 결정)
+        winner_idx, price = resolve_sealed_bids(bids, self.mode, reserve=100, priority=self.round)
+        self.round += 1
+
+        if winner_idx is None:
+            print("유효한 입찰이 없습니다. 경매가 무효 처리되어 카드 획득은 없습니다.")
         else:
-            # AI가 낙찰 시 입찰 금액만큼 포인트 차감 및 카드 획득
-            ai.points -= bid_ai
-            ai.add_card(Card(current_card))
-            print(f"{ai.name}가 {current_card} 카드를 낙찰 받았습니다!")
+            # 낙찰자만 지불 금액만큼 포인트 차감 및 카드 획득
+            winner = bidders[winner_idx]
+            winner.points -= price
+            winner.add_card(Card(current_card, lot.tier))
+            print(f"{winner.name}가 {price} 포인트에 {current_card} 카드를 낙찰 받았습니다!")
 
         input("계속 진행하려면 엔터를 누르세요...")
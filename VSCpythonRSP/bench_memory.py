@@ -0,0 +1,198 @@
+# bench_memory.py
+"""
+메모리 회귀 벤치마크:
+- 서버를 --memory 옵션으로 따로 띄우고, 루프백으로 방을 0개에서 N개까지 단계적으로 늘리며 메모리를 잽니다.
+  idle: 접속만 하고 입찰하지 않는 방, active: 계속 입찰하고 카드를 내는 방 (게임이 끝나면 다시 접속)
+- 방 수에 대한 추적 메모리의 기울기(최소제곱)를 방당 바이트로 보고,
+  memory_thresholds.json의 기준을 넘으면 실패(종료 코드 1)합니다.
+- 예) python bench_memory.py --rooms 1000
+      python bench_memory.py --update   (이번 측정값에 여유분을 더해 기준 갱신)
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from loadgen import LoadClient, free_port, open_clients, raise_fd_limit
+from memory import CATEGORIES, request_report
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+THRESHOLDS_PATH = os.path.join(HERE, "memory_thresholds.json")
+UPDATE_MARGIN = 1.25       # --update로 기준을 만들 때 측정값에 곱하는 여유분
+
+
+class Scenario:
+    """서버 프로세스 하나와 부하 클라이언트들"""
+    def __init__(self, active, room_size, think):
+        self.active = active
+        self.room_size = room_size
+        self.think = think
+        self.port = free_port()
+        self.control_path = os.path.join(tempfile.mkdtemp(), "bench.ctl")
+        self.clients = []
+        self.tasks = []
+        self.process = None
+
+    def start_server(self):
+        command = [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(self.port),
+                   "--room-size", str(self.room_size), "--bot-wait", "-1",
+                   "--exempt-ip", "127.0.0.1", "--control", self.control_path, "--memory"]
+        self.process = subprocess.Popen(command, cwd=HERE, stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.control_path):
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("서버를 시작하지 못했습니다.")
+            time.sleep(0.05)
+
+    def stop_server(self):
+        self.process.send_signal(signal.SIGINT)
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        shutil.rmtree(os.path.dirname(self.control_path), ignore_errors=True)
+
+    async def report(self, detail=False):
+        return await asyncio.to_thread(request_report, self.control_path, detail)
+
+    async def add_rooms(self, rooms):
+        new = [LoadClient("127.0.0.1", self.port, f"b{len(self.clients) + i}", self.active, self.think)
+               for i in range(rooms * self.room_size)]
+        self.clients.extend(new)
+        self.tasks.extend(await open_clients(new))
+
+    async def settle(self, target, timeout=30.0):
+        """서버의 방 수가 목표에 닿을 때까지 기다림 (active는 게임이 끝나고 다시 모이는 중인 방이 있음)"""
+        wanted = target if not self.active else int(target * 0.8)
+        deadline = time.monotonic() + timeout
+        while True:
+            report = await self.report()
+            if report["rooms"] >= wanted or time.monotonic() > deadline:
+                return report
+            await asyncio.sleep(0.2)
+
+    async def sample(self, samples=3):
+        """추적 메모리를 몇 번 재서 가운데 값을 고름 (active는 주고받는 메시지 때문에 흔들림)"""
+        reports = []
+        for _ in range(samples):
+            await asyncio.sleep(0.3)
+            reports.append(await self.report())
+        reports.sort(key=lambda report: report["traced"])
+        return reports[len(reports) // 2]
+
+    async def stop_clients(self):
+        for client in self.clients:
+            client.stop()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+def slope(points):
+    """(방 수, 바이트) 점들의 최소제곱 기울기"""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+async def run_scenario(name, rooms, steps, room_size, think):
+    scenario = Scenario(name == "active", room_size, think)
+    scenario.start_server()
+    try:
+        base = await scenario.report(detail=True)
+        points = [(0, base["traced"])]
+        added = 0
+        for step in range(1, steps + 1):
+            target = rooms * step // steps
+            await scenario.add_rooms(target - added)
+            added = target
+            await scenario.settle(target)
+            report = await scenario.sample()
+            points.append((report["rooms"], report["traced"]))
+            print(f"  [{name}] 방 {report['rooms']:>6}개, 연결 {report['connections']:>6}개: "
+                  f"{report['traced'] / 1024 / 1024:8.2f}MB")
+        final = await scenario.report(detail=True)
+        await scenario.stop_clients()
+    finally:
+        scenario.stop_server()
+
+    per_room = slope(points)
+    result = {
+        "bytes_per_room": per_room,
+        "bytes_per_connection": per_room / room_size,
+        "charged_per_room": final["bytes_per_room"],
+    }
+    print(f"  [{name}] 방당 {per_room:.0f} bytes (연결당 {per_room / room_size:.0f} bytes), "
+          f"방에 직접 기록된 순증 평균 {final['bytes_per_room']:.0f} bytes")
+    if final["rooms"]:
+        for category in sorted(set(CATEGORIES.values()) | {"기타"}):
+            grown = final["breakdown"].get(category, 0) - base["breakdown"].get(category, 0)
+            if grown >= final["rooms"]:
+                print(f"      {category:<14} {grown / final['rooms']:8.0f} bytes/방")
+    return result
+
+
+def check(results, thresholds):
+    """기준을 넘은 항목 목록을 반환"""
+    failures = []
+    for name, limits in thresholds.items():
+        for key, limit in limits.items():
+            measured = results.get(name, {}).get(key)
+            if measured is not None and measured > limit:
+                failures.append(f"{name}.{key}: {measured:.0f} > 기준 {limit:.0f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="방당 메모리 회귀 벤치마크")
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=4, help="방 수를 몇 단계로 늘릴지")
+    parser.add_argument("--room-size", type=int, default=2)
+    parser.add_argument("--think", type=float, default=0.1, help="active 클라이언트의 평균 응답 간격(초)")
+    parser.add_argument("--scenario", choices=["idle", "active"], action="append",
+                        help="돌릴 시나리오 (기본: 둘 다)")
+    parser.add_argument("--update", action="store_true", help="이번 측정값으로 기준 파일을 갱신")
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    results = {}
+    for name in args.scenario or ["idle", "active"]:
+        print(f"{name}: 방 0 -> {args.rooms}개 (인원 {args.room_size})")
+        results[name] = asyncio.run(run_scenario(name, args.rooms, args.steps,
+                                                 args.room_size, args.think))
+
+    if args.update:
+        thresholds = {}
+        if os.path.exists(THRESHOLDS_PATH):
+            with open(THRESHOLDS_PATH, encoding="utf-8") as f:
+                thresholds = json.load(f)
+        for name, result in results.items():
+            thresholds[name] = {"bytes_per_room": round(result["bytes_per_room"] * UPDATE_MARGIN)}
+        with open(THRESHOLDS_PATH, "w", encoding="utf-8") as f:
+            json.dump(thresholds, f, indent=2)
+            f.write("\n")
+        print(f"기준을 갱신했습니다: {THRESHOLDS_PATH}")
+        return
+
+    if not os.path.exists(THRESHOLDS_PATH):
+        print("기준 파일이 없습니다. --update로 먼저 만드세요.")
+        return
+    with open(THRESHOLDS_PATH, encoding="utf-8") as f:
+        failures = check(results, json.load(f))
+    if failures:
+        print("메모리 회귀:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("기준 이내입니다.")
+
+
+if __name__ == "__main__":
+    main()
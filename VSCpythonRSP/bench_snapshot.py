@@ -0,0 +1,93 @@
+# bench_snapshot.py
+"""
+무중단 재시작 벤치마크:
+- 소켓 없이 방 N개를 만들어 제각각 몇 라운드씩 진행시킨 뒤
+  스냅샷 생성/저장/읽기/복원에 걸리는 시간과 파일 크기를 측정합니다.
+- 예) python bench_snapshot.py --rooms 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import snapshot
+from server import ClientSeat, GameServer, RoomSession
+
+
+def play_random_steps(room, steps):
+    """방을 무작위 입력으로 steps번 진행 (경매/배틀 상태가 섞이도록)"""
+    for _ in range(steps):
+        if room.finished:
+            return
+        for seat, kind in sorted(room.waiting.items()):
+            player = room.players[seat]
+            if kind == "BID":
+                room.handle(seat, f"BID:{random.randint(0, min(player.points, 300))}")
+            else:
+                room.handle(seat, f"CARD:{random.choice(player.cards).name}")
+
+
+def build_rooms(server, rooms, room_size):
+    for room_id in range(1, rooms + 1):
+        seats = [ClientSeat(f"p{room_id}_{i}", None) for i in range(room_size)]
+        session = RoomSession(room_id, seats, server.mode)
+        server.add_session(session)
+        session.room.start()
+        play_random_steps(session.room, random.randint(0, 40))
+    server.next_room_id = rooms + 1
+
+
+def timed(label, results, func, *args):
+    started = time.perf_counter()
+    value = func(*args)
+    results[label] = (time.perf_counter() - started) * 1000
+    return value
+
+
+async def run(rooms, room_size, path):
+    results = {}
+    old = GameServer(room_size=room_size)
+    timed("build", results, build_rooms, old, rooms, room_size)
+    alive = len(old.sessions)
+
+    state, _ = timed("snapshot", results, old.snapshot_state, False)
+    size = timed("save", results, snapshot.save, path, state)
+    loaded = timed("load", results, snapshot.load, path)
+
+    new = GameServer(room_size=room_size)
+    started = time.perf_counter()
+    await new.restore_state(loaded, [])
+    results["restore"] = (time.perf_counter() - started) * 1000
+    assert len(new.sessions) == alive
+
+    # 재접속 대기 타이머 정리
+    for session in new.sessions.values():
+        for seat in session.seats:
+            if seat.grace_timer is not None:
+                seat.grace_timer.cancel()
+
+    print(f"방 {alive}개 (인원 {room_size}), 스냅샷 {size / 1024 / 1024:.2f}MB "
+          f"({size / max(alive, 1):.0f} bytes/방)")
+    for label in ("snapshot", "save", "load", "restore"):
+        print(f"  {label:<8} {results[label]:9.1f} ms  ({results[label] * 1000 / max(alive, 1):.2f} µs/방)")
+    total = results["snapshot"] + results["save"] + results["load"] + results["restore"]
+    print(f"  {'total':<8} {total:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스냅샷 저장/복원 벤치마크")
+    parser.add_argument("--rooms", type=int, default=100000)
+    parser.add_argument("--room-size", type=int, default=2)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".snapshot")
+    os.close(fd)
+    try:
+        asyncio.run(run(args.rooms, args.room_size, path))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# bench_startup.py
+"""
+서버 시작 시간 벤치마크:
+- 서버 프로세스를 여러 번 새로 띄우며, 프로세스를 만든 때부터
+  접속 가능(루프백 connect 성공)과 첫 연결 수락(서버가 "첫 연결 수락"을 출력)까지 걸린 시간을 잽니다.
+- 서버가 스스로 보고하는 import 시간, 게임 모듈/규칙 데이터 준비 시간, 첫 연결 직후의 RSS도 함께 봅니다.
+- 비교용으로 아무것도 import하지 않는 인터프리터 시작 시간도 잽니다. (서버 쪽에서 줄일 수 없는 부분)
+- 예) python bench_startup.py --runs 20
+      python bench_startup.py --check   (첫 연결 수락 중앙값이 --target ms를 넘으면 종료 코드 1)
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from loadgen import free_port
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+NUMBER = re.compile(r"([0-9.]+)ms")
+
+
+def rss_mb(pid):
+    """리눅스에서 프로세스의 RSS(MB). 다른 운영체제에서는 None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def interpreter_baseline():
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_once():
+    """서버를 한 번 띄워 시간을 재고 종료. 측정값 딕셔너리를 반환"""
+    port = free_port()
+    command = [sys.executable, "-u", "server.py", "--host", "127.0.0.1", "--port", str(port),
+               "--bot-wait", "-1", "--exempt-ip", "127.0.0.1"]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=HERE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, encoding="utf-8")
+    result = {}
+    probe = None
+    try:
+        deadline = started + 10
+        while probe is None:
+            try:
+                probe = socket.create_connection(("127.0.0.1", port), timeout=0.2)
+            except OSError:
+                if process.poll() is not None or time.perf_counter() > deadline:
+                    raise RuntimeError("서버를 시작하지 못했습니다.")
+                time.sleep(0.001)
+        result["connect"] = (time.perf_counter() - started) * 1000
+
+        # 서버의 보고를 읽음 (첫 연결 수락 줄이 나올 때까지)
+        for line in process.stdout:
+            if line.startswith("시작 시간"):
+                result["import"] = float(NUMBER.findall(line)[0])
+            elif line.startswith("게임 모듈/규칙 데이터"):
+                result["warm_up"] = float(NUMBER.findall(line)[0])
+                result["cache"] = "규칙 캐시" in line
+            elif line.startswith("첫 연결 수락"):
+                result["accept"] = (time.perf_counter() - started) * 1000
+                result["reported_accept"] = float(NUMBER.findall(line)[0])
+                break
+        result["rss"] = rss_mb(process.pid)
+    finally:
+        if probe is not None:
+            probe.close()
+        process.kill()
+        process.wait()
+    return result
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 시작 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target", type=float, default=50.0, help="첫 연결 수락까지의 목표(ms)")
+    parser.add_argument("--check", action="store_true", help="목표를 넘으면 종료 코드 1")
+    args = parser.parse_args()
+
+    baseline = median([interpreter_baseline() for _ in range(args.runs)])
+    runs = [measure_once() for _ in range(args.runs)]
+
+    def column(key):
+        return [run[key] for run in runs if run.get(key) is not None]
+
+    accept = median(column("accept"))
+    print(f"서버 {args.runs}번 시작 (중앙값):")
+    print(f"  인터프리터만 시작 (python -c pass)  {baseline:7.1f}ms")
+    print(f"  접속 가능 (connect 성공)           {median(column('connect')):7.1f}ms")
+    print(f"  첫 연결 수락                       {accept:7.1f}ms  (목표 {args.target:.0f}ms)")
+    print(f"  서버 보고: import {median(column('import')):.1f}ms, "
+          f"첫 연결 수락 {median(column('reported_accept')):.1f}ms (인터프리터 시작 제외), "
+          f"게임 모듈/규칙 데이터 {median(column('warm_up')):.1f}ms "
+          f"({'규칙 캐시' if all(column('cache')) else '설정에서 계산'})")
+    if column("rss"):
+        print(f"  첫 연결 직후 RSS                   {median(column('rss')):7.1f}MB")
+    if accept > args.target:
+        print(f"목표를 넘었습니다. (인터프리터 시작만 {baseline:.1f}ms)")
+        if args.check:
+            sys.exit(1)
+    else:
+        print("목표 이내입니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# bots.py
+import random
+import rulecache
+import settings
+from protocol import CARD_TYPES
+
+CARD_INDEX = {name: i for i, name in enumerate(CARD_TYPES)}
+
+
+def random_policy(room, seat, message):
+    """클라이언트 AI 모드와 같은 방식: 0 ~ 300 포인트 랜덤 입찰, 카드는 랜덤 선택"""
+    player = room.players[seat]
+    cmd = message.split(":", 1)[0]
+    if cmd == "AUCTION_CARD":
+        return f"BID:{random.randint(0, min(player.points, 300))}"
+    if cmd == "AUCTION_LOTS":
+        # 묶음 경매: 포인트를 카드 수로 나눈 범위 안에서 카드마다 랜덤 입찰 (합계가 포인트를 넘지 않음)
+        count = len(message.split(":", 1)[1].split(","))
+        limit = min(player.points // count, 300)
+        return "BIDS:" + ",".join(str(random.randint(0, limit)) for _ in range(count))
+    if cmd == "BATTLE_START":
+        return f"CARD:{random.choice(player.cards).name}"
+    return None
+
+
+def counter_policy(room, seat, message):
+    """
+    조금 더 똑똑한 봇:
+    - 경매: 적게 가진 카드일수록 높게 입찰 (최소 입찰 포인트가 없으면 포기)
+    - 배틀: 상대가 남긴 카드 분포를 보고 이길 수 있는 경우가 가장 많은 카드를 선택
+      (서버 안의 봇이므로 메시지 대신 방의 상태를 바로 읽습니다.)
+    """
+    player = room.players[seat]
+    fields = message.split(":")
+    if fields[0] == "AUCTION_CARD":
+        if player.points < settings.MIN_BID:
+            return "BID:0"
+        owned = sum(1 for card in player.cards if card.name == fields[1])
+        return f"BID:{min(player.points, max(settings.MIN_BID, 300 - 100 * owned))}"
+    if fields[0] == "AUCTION_LOTS":
+        # 묶음 경매: 카드마다 같은 기준으로 입찰하되, 남은 포인트 안에서 앞 카드부터 배정
+        owned = {}
+        for card in player.cards:
+            owned[card.name] = owned.get(card.name, 0) + 1
+        budget = player.points
+        bids = []
+        for lot in fields[1].split(","):
+            name = lot.split("/")[0]
+            bid = min(budget, max(settings.MIN_BID, 300 - 100 * owned.get(name, 0)))
+            if bid < settings.MIN_BID:
+                bid = 0
+            owned[name] = owned.get(name, 0) + 1
+            budget -= bid
+            bids.append(bid)
+        return "BIDS:" + ",".join(map(str, bids))
+    if fields[0] == "BATTLE_START":
+        # 상성표(이기면 1, 지면 -1)로 상대 카드마다 점수를 더함
+        matchup = rulecache.matchup()
+        n = len(CARD_TYPES)
+        opponent_cards = [CARD_INDEX[card.name] for card in room.players[room.opponent_of(seat)].cards]
+
+        def score(name):
+            row = CARD_INDEX[name] * n
+            return sum(matchup[row + card] for card in opponent_cards)
+
+        best = max(player.cards, key=lambda card: score(card.name))
+        return f"CARD:{best.name}"
+    return None
+
+
+POLICIES = {
+    "random": random_policy,
+    "counter": counter_policy,
+}
+
+
+class Bot:
+    """
+    서버 안에서 동작하는 봇 좌석:
+    - 소켓도 스레드도 없이, 방이 보낸 메시지를 정책 함수로 바로 처리합니다.
+    - 응답은 방의 수신 대기열에 넣으므로 방 처리 도중 다시 들어가는 일이 없습니다.
+    """
+    is_bot = True
+    __slots__ = ("name", "policy", "deliver", "session", "seat")
+
+    def __init__(self, name, policy, deliver):
+        self.name = name
+        self.policy = policy
+        self.deliver = deliver
+        self.session = None
+        self.seat = None
+
+    def send(self, message):
+        if self.session is None:
+            return
+        response = self.policy(self.session.room, self.seat, message)
+        if response:
+            self.deliver(self.session, self.seat, response)
+
+    queue = send  # 봇은 프레임으로 모을 필요 없이 바로 처리
+
+
+class BotPool:
+    """
+    봇 풀:
+    - 사람이 제때 모이지 않은 방의 빈자리를 봇으로 채웁니다.
+    - 게임이 끝난 봇은 반납되어 다음 방에서 다시 사용됩니다.
+    """
+    def __init__(self, policy, deliver):
+        if policy not in POLICIES:
+            raise ValueError(f"알 수 없는 봇 정책입니다: {policy}")
+        self.policy = POLICIES[policy]
+        self.deliver = deliver
+        self.free = []
+        self.created = 0
+        self.in_use = 0
+
+    def acquire(self, count):
+        """봇 count개를 빌려줍니다. (남는 봇이 없으면 새로 만듦)"""
+        bots = []
+        for _ in range(count):
+            if self.free:
+                bot = self.free.pop()
+            else:
+                self.created += 1
+                bot = Bot(f"봇{self.created}", self.policy, self.deliver)
+            bots.append(bot)
+        self.in_use += count
+        return bots
+
+    def release(self, bot):
+        """게임이 끝난 봇을 반납"""
+        bot.session = None
+        bot.seat = None
+        self.in_use -= 1
+        self.free.append(bot)
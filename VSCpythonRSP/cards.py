@@ -1,7 +1,10 @@
 # cards.py
 class Card:
-    def __init__(self, name):
+    def __init__(self, name, tier=None):
         self.name = name
+        self.tier = tier  # 이벤트 덱의 희귀도 (없으면 None)
 
     def __repr__(self):
+        if self.tier:
+            return f"Card({self.name}, {self.tier})"
         return f"Card({self.name})"
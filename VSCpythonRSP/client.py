@@ -1,9 +1,51 @@
 import socket
-import json
 import os
+import queue
+import selectors
+import sys
 import time
 import random
 import threading
+import settings
+from protocol import PIPELINE, LineBuffer, decode_counts, encode, split_frame
+
+
+class InputReader(threading.Thread):
+    """
+    표준 입력을 따로 읽는 스레드:
+    - 한 줄 읽을 때마다 (줄, 읽은 시각)을 큐에 넣고 소켓쌍으로 메인 루프를 깨웁니다.
+    - 윈도우의 select는 소켓만 감시할 수 있으므로 stdin 대신 소켓쌍을 감시합니다.
+    - 입력이 끝나면(EOF) 빈 문자열을 넣고 종료합니다.
+    """
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.lines = queue.Queue()
+        self.wakeup, self.notify = socket.socketpair()
+        self.wakeup.setblocking(False)
+
+    def run(self):
+        while True:
+            line = sys.stdin.readline()
+            self.lines.put((line, time.monotonic()))
+            try:
+                self.notify.send(b"\0")
+            except OSError:
+                return
+            if not line:
+                return
+
+    def read_lines(self):
+        """깨우기 신호를 비우고 쌓인 (줄, 시각)을 모두 꺼냄"""
+        try:
+            while self.wakeup.recv(1024):
+                pass
+        except BlockingIOError:
+            pass
+        lines = []
+        while not self.lines.empty():
+            lines.append(self.lines.get_nowait())
+        return lines
+
 
 class GameClient:
     def __init__(self, host=None, port=5000):
@@ -13,9 +55,18 @@ class GameClient:
         self.points = 1000  # 초기 포인트
         self.cards = []     # 보유 카드
         self.opponent_cards = []  # 상대방 카드
+        self.opponent_counts = {}  # 온라인 대전 상대방의 카드 종류별 장수
         self.is_ai_mode = False  # AI 모드 여부
         self.running = True  # 클라이언트 실행 상태
         self.opponent_name = ""  # 상대방 이름
+        self.buffer = LineBuffer()  # 수신 데이터를 줄 단위 메시지로 분리
+        self.pending = []  # 이미 받았지만 아직 처리하지 않은 메시지
+        self.session_token = None  # 연결이 끊겼을 때 같은 자리로 돌아가기 위한 토큰
+        self.prompt = None  # 답을 기다리는 입력 요청 (종류, 안내 문구, 보여준 시각)
+        self.auction_card = None  # 지금 경매 중인 카드
+        self.auction_lots = []  # 묶음 경매로 한꺼번에 공개된 카드
+        self.selector = None
+        self.input_reader = None
 
     def connect(self):
         """서버에 연결"""
@@ -38,8 +89,13 @@ class GameClient:
             self.start_ai_mode()
             return
 
+        # 온라인 대전은 서버의 플레이어와 같이 기본 카드를 가지고 시작
+        self.cards = list(settings.DEFAULT_CARDS)
+
         if self.host is None:
             self.host = input("서버 IP 주소를 입력하세요: ")
+        # 서버는 접속 후 정해진 시간 안에 이름을 받아야 하므로 연결 전에 미리 입력받음
+        player_name = input("플레이어 이름을 입력하세요: ")
         
         max_attempts = 3
         current_attempt = 0
@@ -52,14 +108,19 @@ class GameClient:
                 self.client.settimeout(5.0)  # 연결 타임아웃 설정
                 self.client.connect((self.host, self.port))
                 print(f"서버에 연결되었습니다. ({self.host}:{self.port})")
+                # 상대방을 기다리거나 입력하는 동안 끊기지 않도록 수신 타임아웃 해제
+                self.client.settimeout(None)
                 
-                # 플레이어 이름 입력 및 전송
-                player_name = input("플레이어 이름을 입력하세요: ")
-                self.send_message(f"PLAYER:{player_name}")
+                # 연결되자마자 플레이어 이름 전송
+                # 결과와 다음 입력 요청을 한 프레임으로 받도록 파이프라인 옵션을 붙임
+                self.send_message(f"PLAYER:{player_name}:{PIPELINE}")
                 
-                # 상대방 정보 수신
+                # 상대방 정보 수신 (세션 토큰이 먼저 옴)
                 print("상대방 정보 대기 중...")
                 opponent_data = self.receive_message()
+                if opponent_data.startswith("SESSION:"):
+                    self.session_token = opponent_data.split(":")[1]
+                    opponent_data = self.receive_message()
                 if opponent_data.startswith("OPPONENT:"):
                     self.opponent_name = opponent_data.split(":")[1]
                     print(f"상대방 플레이어: {self.opponent_name}")
@@ -104,7 +165,7 @@ class GameClient:
     def send_message(self, message):
         """안전한 메시지 전송"""
         try:
-            self.client.send(message.encode())
+            self.client.sendall(encode(message))
             return True
         except Exception as e:
             print(f"메시지 전송 실패: {e}")
@@ -113,136 +174,307 @@ class GameClient:
     def receive_message(self):
         """안전한 메시지 수신"""
         try:
-            data = self.client.recv(1024).decode()
-            if not data:
-                raise ConnectionError("서버와의 연결이 끊어졌습니다.")
-            return data
+            while not self.pending:
+                data = self.client.recv(1024)
+                if not data:
+                    raise ConnectionError("서버와의 연결이 끊어졌습니다.")
+                for frame in self.buffer.feed(data):
+                    self.pending.extend(split_frame(frame))
+            return self.pending.pop(0)
         except Exception as e:
             print(f"메시지 수신 실패: {e}")
             raise
 
+    def resume(self):
+        """
+        연결이 끊겼을 때 세션 토큰으로 같은 자리에 다시 접속 (서버 재시작 중에도 사용)
+        성공하면 서버가 현재 상태(STATE)와 기다리던 메시지를 다시 보내줍니다.
+        """
+        if self.session_token is None:
+            return False
+        for attempt in range(settings.RESUME_ATTEMPTS):
+            print(f"\n서버에 다시 연결하는 중... ({attempt + 1}/{settings.RESUME_ATTEMPTS})")
+            time.sleep(1)
+            try:
+                self.client.close()
+                self.client = socket.create_connection((self.host, self.port), timeout=5.0)
+                self.client.settimeout(None)
+                self.buffer = LineBuffer()
+                self.pending = []
+                self.send_message(f"RESUME:{self.session_token}:{PIPELINE}")
+                if self.receive_message() == "RESUMED":
+                    print("다시 연결되었습니다.")
+                    return True
+                return False
+            except OSError:
+                continue
+        return False
+
+    def handle_state(self, data):
+        """
+        서버가 알려준 현재 포인트와 카드로 맞춤 (재접속 직후)
+        배틀 중이면 "STATE:포인트:카드:상대 카드:상대 이름"으로 상대의 카드 장수도 옴
+        """
+        fields = data.split(":")
+        self.points = int(fields[1])
+        self.cards = [card for card, count in decode_counts(fields[2]).items() for _ in range(count)]
+        if len(fields) > 4:
+            self.opponent_counts = decode_counts(fields[3])
+            self.opponent_name = fields[4]
+
     def game_loop(self):
-        """게임 진행"""
+        """
+        게임 진행: 서버 소켓과 입력 스레드를 selectors로 함께 감시합니다.
+        - 서버 메시지는 사용자가 입력하는 중에도 바로 처리합니다. (결과, 상태 동기화, 알림)
+        - 새 입력 요청이 오거나 서버가 먼저 결과를 정하면 이전 입력 요청은 취소합니다.
+        """
+        self.input_reader = InputReader()
+        self.input_reader.start()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.client, selectors.EVENT_READ, self.on_network)
+        self.selector.register(self.input_reader.wakeup, selectors.EVENT_READ, self.on_input)
         try:
+            # 접속 과정에서 함께 받은 메시지부터 처리
+            self.dispatch_pending()
             while self.running:
-                data = self.receive_message()
-                if not data:
-                    break
-                
-                cmd = data.split(":")[0]
-                
-                if cmd == "AUCTION_CARD":
-                    self.handle_auction(data)
-                elif cmd == "BATTLE_START":
-                    self.handle_battle(data)
-                elif cmd == "GAME_OVER":
-                    self.handle_game_over(data)
-                    break
-                
+                for key, _ in self.selector.select():
+                    key.data()
+                    if not self.running:
+                        break
+
         except ConnectionError:
             print("\n서버와의 연결이 끊어졌습니다.")
         except Exception as e:
             print(f"\n게임 진행 중 오류 발생: {e}")
         finally:
+            self.selector.close()
             self.cleanup()
 
-    def handle_auction(self, data):
-        """경매 처리"""
+    def on_network(self):
+        """서버에서 온 데이터를 줄 단위로 나눠 바로 처리 (끊겼으면 재접속)"""
         try:
-            card_name = data.split(":")[1]
-            self.clear_console()
-            print(f"\n🎴 현재 경매 카드: {card_name}")
-            print(f"💰 보유 포인트: {self.points}")
-            
-            while True:
-                try:
-                    bid = int(input("입찰가를 입력하세요 (0은 포기): "))
-                    if 0 <= bid <= self.points:
-                        break
-                    print("잘못된 입력입니다. 보유 포인트 이하의 값을 입력하세요.")
-                except ValueError:
-                    print("숫자를 입력해주세요.")
-            
-            # 입찰가 전송
-            if not self.send_message(f"BID:{bid}"):
+            data = self.client.recv(4096)
+            if not data:
+                raise ConnectionError("서버와의 연결이 끊어졌습니다.")
+            for frame in self.buffer.feed(data):
+                self.pending.extend(split_frame(frame))
+        except OSError:  # ConnectionError 포함
+            self.cancel_prompt()
+            self.selector.unregister(self.client)
+            if not self.resume():
+                raise ConnectionError("서버와의 연결이 끊어졌습니다.")
+            self.selector.register(self.client, selectors.EVENT_READ, self.on_network)
+        self.dispatch_pending()
+
+    def dispatch_pending(self):
+        while self.pending and self.running:
+            data = self.pending.pop(0)
+            cmd = data.split(":")[0]
+
+            if cmd == "AUCTION_CARD":
+                self.handle_auction(data)
+            elif cmd == "AUCTION_RESULT":
+                self.handle_auction_result(data)
+            elif cmd == "AUCTION_LOTS":
+                self.handle_auction_lots(data)
+            elif cmd == "AUCTION_RESULTS":
+                self.handle_auction_results(data)
+            elif cmd == "BATTLE_START":
+                self.handle_battle(data)
+            elif cmd == "BATTLE_RESULT":
+                self.handle_battle_result(data)
+            elif cmd == "STATE":
+                self.handle_state(data)
+            elif cmd == "NOTICE":
+                self.handle_notice(data)
+            elif cmd == "GAME_OVER":
+                self.cancel_prompt()
+                self.handle_game_over(data)
+                self.running = False
+
+    # ---------------- 입력 요청 ----------------
+
+    def ask(self, kind, text):
+        """입력 요청을 띄움 (답하지 않은 이전 요청이 있으면 취소)"""
+        if self.prompt is not None:
+            print("\n(이전 입력 요청은 취소되었습니다.)")
+        self.prompt = (kind, text, time.monotonic())
+        print(text, end="", flush=True)
+
+    def cancel_prompt(self, reason=None):
+        if self.prompt is not None:
+            self.prompt = None
+            if reason:
+                print(f"\n({reason})")
+
+    def on_input(self):
+        """입력 스레드가 읽은 줄을 현재 입력 요청에 맞춰 처리"""
+        for line, read_at in self.input_reader.read_lines():
+            if not line:
+                print("\n입력이 종료되어 게임을 마칩니다.")
+                self.running = False
                 return
-            
-            # 경매 결과 수신
-            result_data = self.receive_message()
-            if not result_data.startswith("AUCTION_RESULT:"):
-                raise ValueError("잘못된 경매 결과 형식입니다.")
-                
-            result, winning_bid = result_data.split(":")[1:]
-            
+            # 입력 요청이 없거나, 지금 요청을 띄우기 전에 친 줄이면 버림
+            if self.prompt is None:
+                print("지금은 입력을 기다리고 있지 않습니다.")
+                continue
+            kind, text, shown_at = self.prompt
+            if read_at < shown_at:
+                continue
+            answer = line.strip()
+            if kind == "BID":
+                self.answer_bid(answer, text)
+            elif kind == "BIDS":
+                self.answer_bids(answer, text)
+            elif kind == "CARD":
+                self.answer_card(answer, text)
+
+    def answer_bid(self, answer, text):
+        try:
+            bid = int(answer)
+        except ValueError:
+            print("숫자를 입력해주세요.")
+            print(text, end="", flush=True)
+            return
+        if not 0 <= bid <= self.points:
+            print("잘못된 입력입니다. 보유 포인트 이하의 값을 입력하세요.")
+            print(text, end="", flush=True)
+            return
+        if 0 < bid < settings.MIN_BID:
+            print(f"최소 입찰가는 {settings.MIN_BID} 포인트입니다. (0은 포기)")
+            print(text, end="", flush=True)
+            return
+        self.prompt = None
+        if self.send_message(f"BID:{bid}"):
+            print("다른 플레이어의 입찰을 기다리는 중...")
+
+    def answer_bids(self, answer, text):
+        """묶음 경매: 카드 순서대로 쉼표로 구분한 입찰가 (합계가 보유 포인트 이하)"""
+        try:
+            bids = [int(value) for value in answer.split(",")]
+        except ValueError:
+            print("숫자를 쉼표로 구분해 입력해주세요.")
+            print(text, end="", flush=True)
+            return
+        if len(bids) != len(self.auction_lots):
+            print(f"카드 {len(self.auction_lots)}장의 입찰가를 모두 입력하세요.")
+            print(text, end="", flush=True)
+            return
+        if min(bids) < 0 or sum(bids) > self.points:
+            print("잘못된 입력입니다. 입찰가 합계가 보유 포인트 이하여야 합니다.")
+            print(text, end="", flush=True)
+            return
+        if any(0 < bid < settings.MIN_BID for bid in bids):
+            print(f"카드마다 최소 입찰가는 {settings.MIN_BID} 포인트입니다. (0은 포기)")
+            print(text, end="", flush=True)
+            return
+        self.prompt = None
+        if self.send_message("BIDS:" + ",".join(map(str, bids))):
+            print("다른 플레이어의 입찰을 기다리는 중...")
+
+    def answer_card(self, answer, text):
+        if answer not in self.cards:
+            print("보유하지 않은 카드입니다.")
+            print(text, end="", flush=True)
+            return
+        self.prompt = None
+        if self.send_message(f"CARD:{answer}"):
+            print("상대방의 선택을 기다리는 중...")
+
+    # ---------------- 서버 메시지 ----------------
+
+    def handle_auction(self, data):
+        """경매 카드 공개: 입찰 입력을 요청하고 결과는 AUCTION_RESULT에서 처리"""
+        fields = data.split(":")
+        self.auction_card = fields[1]
+        tier = f" ({fields[2]})" if len(fields) > 2 else ""  # 이벤트 덱이면 희귀도가 붙어 옴
+        print("\n" + "-" * 30)
+        print(f"🎴 현재 경매 카드: {self.auction_card}{tier}")
+        print(f"💰 보유 포인트: {self.points}")
+        self.ask("BID", f"입찰가를 입력하세요 (최소 {settings.MIN_BID}, 0은 포기): ")
+
+    def handle_auction_result(self, data):
+        # "AUCTION_RESULT:WIN:150:가위" (재접속하면 경매 카드를 못 봤을 수 있으므로 결과의 카드 이름을 씀)
+        fields = data.split(":")
+        result, winning_bid = fields[1], fields[2]
+        if len(fields) > 3:
+            self.auction_card = fields[3]
+        self.cancel_prompt("경매가 먼저 끝나 입찰 요청이 취소되었습니다.")
+
+        if result == "WIN":
+            self.points -= int(winning_bid)
+            self.cards.append(self.auction_card)
+            print(f"\n🎉 경매 승리! {self.auction_card} 카드를 획득했습니다.")
+        else:
+            print("\n😢 경매에서 패배했습니다.")
+
+    def handle_auction_lots(self, data):
+        """묶음 경매: 카드 여러 장이 한꺼번에 공개되고 입찰가 목록을 한 번에 보냄"""
+        lots = [lot.split("/") for lot in data.split(":", 1)[1].split(",")]
+        self.auction_lots = [lot[0] for lot in lots]
+        print("\n" + "-" * 30)
+        print("🎴 이번 경매 카드:", ", ".join(
+            f"{i + 1}. {lot[0]}" + (f" ({lot[1]})" if len(lot) > 1 else "") for i, lot in enumerate(lots)))
+        print(f"💰 보유 포인트: {self.points} (입찰가 합계는 보유 포인트 이하)")
+        self.ask("BIDS", "카드 순서대로 입찰가를 쉼표로 구분해 입력하세요 (예: 100,0,200): ")
+
+    def handle_auction_results(self, data):
+        # "AUCTION_RESULTS:WIN/150/가위,LOSE/120/바위" (결과/낙찰가/카드)
+        results = [item.split("/") for item in data.split(":", 1)[1].split(",")]
+        self.cancel_prompt("경매가 먼저 끝나 입찰 요청이 취소되었습니다.")
+
+        for result, winning_bid, card_name in results:
             if result == "WIN":
                 self.points -= int(winning_bid)
                 self.cards.append(card_name)
-                print(f"\n🎉 경매 승리! {card_name} 카드를 획득했습니다.")
+                print(f"🎉 {card_name}: 낙찰! ({winning_bid} 포인트)")
             else:
-                print("\n😢 경매에서 패배했습니다.")
-            
-            time.sleep(2)
-            
-        except Exception as e:
-            print(f"경매 처리 중 오류 발생: {e}")
-            raise
+                print(f"😢 {card_name}: 유찰 또는 패배")
 
     def handle_battle(self, data):
-        """배틀 페이즈 처리"""
-        try:
-            # 상대방 카드 정보 업데이트
-            opponent_cards = data.split(":")[2].split(",")
-            self.opponent_cards = opponent_cards
-            
-            self.clear_console()
-            print("\n⚔️ 배틀 페이즈 시작!")
-            print(f"\n{self.opponent_name}의 보유 카드:", ", ".join(self.opponent_cards))
-            print("내 보유 카드:", ", ".join(self.cards))
-            
-            while True:
-                card_choice = input("\n사용할 카드를 선택하세요 (가위/바위/보): ")
-                if card_choice in self.cards:
-                    break
-                print("보유하지 않은 카드입니다.")
-            
-            # 선택한 카드 전송
-            if not self.send_message(f"CARD:{card_choice}"):
-                return
-            
-            # 결과 수신
-            result_data = self.receive_message()
-            if not result_data.startswith("BATTLE_RESULT:"):
-                raise ValueError("잘못된 대결 결과 형식입니다.")
-                
-            result, my_card, opponent_card, opponent_cards = result_data.split(":")
-            self.opponent_cards = opponent_cards.split(",")
-            
-            print(f"\n🎴 나의 카드: {my_card}")
-            print(f"🎴 상대방 카드: {opponent_card}")
-            
-            if result == "TIE":
-                print("\n🔄 무승부!")
-            elif result == "WIN":
-                print("\n🎉 승리!")
-                if opponent_card in self.opponent_cards:
-                    self.opponent_cards.remove(opponent_card)
-            else:
-                print("\n😢 패배...")
-                if my_card in self.cards:
-                    self.cards.remove(my_card)
-            
-            time.sleep(2)
-            
-        except Exception as e:
-            print(f"배틀 처리 중 오류 발생: {e}")
-            raise
+        """배틀 라운드 시작: 카드 선택을 요청하고 결과는 BATTLE_RESULT에서 처리"""
+        # 상대가 바뀌었을 때만 카드 장수와 이름이 오고, 같은 상대면 지난 결과로 갱신한 값을 사용
+        fields = data.split(":")
+        if len(fields) > 3:
+            self.opponent_counts = decode_counts(fields[2])
+            self.opponent_name = fields[3]
+
+        print("\n" + "-" * 30)
+        print("⚔️ 배틀 라운드!")
+        print(f"{self.opponent_name}의 보유 카드:",
+              ", ".join(f"{card} {count}장" for card, count in self.opponent_counts.items()))
+        print("내 보유 카드:", ", ".join(self.cards))
+        self.ask("CARD", "사용할 카드를 선택하세요 (가위/바위/보): ")
+
+    def handle_battle_result(self, data):
+        result, my_card, opponent_card = data.split(":")[1:]
+        self.cancel_prompt("라운드가 먼저 끝나 카드 선택이 취소되었습니다.")
+
+        print(f"\n🎴 나의 카드: {my_card}")
+        print(f"🎴 상대방 카드: {opponent_card}")
+
+        if result == "TIE":
+            print("\n🔄 무승부!")
+        elif result == "WIN":
+            print("\n🎉 승리!")
+            self.opponent_counts[opponent_card] -= 1
+        else:
+            print("\n😢 패배...")
+            if my_card in self.cards:
+                self.cards.remove(my_card)
+
+    def handle_notice(self, data):
+        """상대 연결 끊김 같은 서버 알림: 입력 중이었다면 안내 문구를 다시 보여줌"""
+        print(f"\n📢 {data.split(':', 1)[1]}")
+        if self.prompt is not None:
+            print(self.prompt[1], end="", flush=True)
 
     def handle_game_over(self, data):
         """게임 종료 처리"""
         try:
             result = data.split(":")[1]
-            self.clear_console()
-            print("\n🏁 게임 종료!")
+            print("\n" + "=" * 30)
+            print("🏁 게임 종료!")
             print(f"결과: {result}")
             print(f"최종 보유 카드: {', '.join(self.cards)}")
             print(f"남은 포인트: {self.points}")
@@ -0,0 +1,297 @@
+# loadgen.py
+"""
+루프백 부하 생성기:
+- 부하용 클라이언트 여러 개로 서버에 접속해 게임을 계속 돌리고,
+  게임당 주고받은 프레임/메시지 수와 라운드 지연(답을 보낸 뒤 다음 입력 요청을 받기까지)을 잽니다.
+- --spawn이면 루프백에 서버를 직접 띄우고, --compare면 파이프라인을 끈 경우와 켠 경우를 차례로 비교합니다.
+- --latency 같은 장애 옵션을 주면 netproxy.py의 프록시를 거쳐 접속하고, 게임 중 연결이 끊기면 RESUME으로 재접속합니다.
+  --baseline이면 프록시 없이 한 번 더 돌려 처리량이 얼마나 떨어지는지 비교합니다.
+- 예) python loadgen.py --spawn --compare --rooms 50 --games 1000
+      python loadgen.py --host 10.0.0.5 --port 5000 --rooms 200 --games 5000
+      python loadgen.py --spawn --baseline --latency 60 --jitter 20 --reset-rate 0.02 --games 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from netproxy import NetProxy, add_impairment_arguments, impairment_from_args
+from protocol import CARD_TYPES, PIPELINE, encode, split_frame
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONNECT_CONCURRENCY = 64   # 서버 backlog를 넘기지 않게 동시에 여는 연결 수
+
+
+def raise_fd_limit():
+    """방 N개면 부하 생성기와 서버가 각각 연결 N * 인원 개를 엶"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(port, *extra_args):
+    """루프백에 서버 프로세스를 띄우고 접속을 받을 때까지 기다림 (봇 없음, 루프백은 수신 제한 제외)"""
+    command = [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port),
+               "--bot-wait", "-1", "--exempt-ip", "127.0.0.1", *extra_args]
+    process = subprocess.Popen(command, cwd=HERE, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("서버를 시작하지 못했습니다.")
+            time.sleep(0.05)
+
+
+class LoadClient:
+    """
+    부하용 클라이언트 하나:
+    - idle이면 메시지를 읽기만 하고 답하지 않아 방이 입찰을 기다리는 상태로 남습니다.
+    - active면 think초 안팎으로 쉬었다가 무작위로 입찰/카드를 보내고, 게임이 끝나면 새 게임에 다시 접속합니다.
+      (가진 카드나 포인트를 따로 세지 않으므로 잘못된 값은 서버가 포기/첫 카드로 처리)
+    - pipeline이면 접속할 때 파이프라인 옵션을 붙이고 받은 프레임을 메시지로 나눠 처리합니다.
+    - 게임 중에 연결이 끊기면 받은 세션 토큰으로 RESUME 재접속을 하고 성공/실패를 셉니다.
+    """
+    def __init__(self, host, port, name, active, think, pipeline=True):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.active = active
+        self.think = think
+        self.pipeline = pipeline
+        self.writer = None
+        self.running = True
+        self.games = 0
+        self.frames = 0           # 받은 프레임(줄) 수
+        self.messages = 0         # 받은 메시지 수
+        self.sent = 0             # 보낸 메시지 수
+        self.latencies = []       # 답을 보낸 뒤 다음 입력 요청이 오기까지 걸린 시간(초)
+        self.answered_at = None
+        self.token = None         # 진행 중인 게임의 세션 토큰 (게임이 끝나면 None)
+        self.drops = 0            # 게임 중에 끊긴 횟수
+        self.resumes = 0
+        self.resume_failed = 0
+
+    async def connect(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        option = f":{PIPELINE}" if self.pipeline else ""
+        if self.token is not None:
+            writer.write(encode(f"RESUME:{self.token}{option}"))
+        else:
+            writer.write(encode(f"PLAYER:{self.name}{option}"))
+        self.writer = writer
+        self.sent += 1
+        self.answered_at = None
+        return reader
+
+    async def run(self, reader):
+        while self.running:
+            try:
+                await self.play(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            self.writer.close()
+            if not (self.running and self.active):
+                return
+            if self.token is not None:
+                self.drops += 1
+            while self.running:
+                try:
+                    reader = await self.connect()
+                    break
+                except OSError:
+                    await asyncio.sleep(0.5)
+
+    async def play(self, reader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            self.frames += 1
+            if not self.active:
+                continue
+            for message in split_frame(line.decode().rstrip("\n")):
+                self.messages += 1
+                cmd = message.split(":", 1)[0]
+                if cmd == "SESSION":
+                    self.token = message.split(":", 1)[1]
+                elif cmd == "RESUMED":
+                    self.resumes += 1
+                elif cmd == "RESUME_FAILED":
+                    # 그 사이 게임이 끝났거나 토큰이 없어짐 -> 새 게임으로
+                    self.resume_failed += 1
+                    self.token = None
+                    return
+                elif cmd == "AUCTION_CARD":
+                    await self.answer(f"BID:{random.choice((0, 100, 150, 200, 300))}")
+                elif cmd == "AUCTION_LOTS":
+                    # 합계가 포인트를 넘으면 서버가 이번 라운드를 포기로 처리
+                    count = len(message.split(":", 1)[1].split(","))
+                    await self.answer("BIDS:" + ",".join(
+                        str(random.choice((0, 0, 100, 150))) for _ in range(count)))
+                elif cmd == "BATTLE_START":
+                    await self.answer(f"CARD:{random.choice(CARD_TYPES)}")
+                elif cmd == "GAME_OVER":
+                    self.games += 1
+                    self.token = None
+                    return
+
+    async def answer(self, response):
+        now = time.perf_counter()
+        if self.answered_at is not None:
+            self.latencies.append(now - self.answered_at)
+        if self.think:
+            await asyncio.sleep(self.think * random.random() * 2)
+        self.writer.write(encode(response))
+        self.sent += 1
+        self.answered_at = time.perf_counter()
+
+    def stop(self):
+        self.running = False
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def open_clients(clients):
+    """연결 수를 제한하며 모두 접속시킨 뒤 각자 게임을 도는 태스크 목록을 반환"""
+    limit = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def open_one(client):
+        async with limit:
+            reader = await client.connect()
+        return asyncio.create_task(client.run(reader))
+
+    return await asyncio.gather(*(open_one(client) for client in clients))
+
+
+async def run_load(host, port, rooms, games, room_size=2, pipeline=True, think=0.0, timeout=600.0,
+                   impairment=None, seed=None):
+    """
+    방 rooms개 분량의 클라이언트로 게임이 games판 끝날 때까지 돌리고 통계를 반환
+    (impairment가 있으면 같은 루프에 장애 프록시를 띄워 그쪽으로 접속)
+    """
+    proxy = None
+    if impairment is not None:
+        proxy = NetProxy(host, port, impairment, seed=seed)
+        host, port = "127.0.0.1", await proxy.start()
+    clients = [LoadClient(host, port, f"g{i}", True, think, pipeline)
+               for i in range(rooms * room_size)]
+    started = time.perf_counter()
+    tasks = await open_clients(clients)
+    deadline = started + timeout
+    # 게임 한 판은 room_size명이 함께 끝냄
+    while sum(client.games for client in clients) < games * room_size and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        client.stop()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if proxy is not None:
+        await proxy.close()
+
+    played = max(sum(client.games for client in clients) / room_size, 1)
+    latencies = sorted(value for client in clients for value in client.latencies)
+    return {
+        "games": played,
+        "elapsed": elapsed,
+        "games_per_sec": played / elapsed,
+        # 한 판을 함께 한 모든 좌석의 합 (접속 메시지 포함)
+        "frames_per_game": sum(client.frames for client in clients) / played,
+        "messages_per_game": sum(client.messages for client in clients) / played,
+        "sent_per_game": sum(client.sent for client in clients) / played,
+        "latency_ms": 1000 * sum(latencies) / max(len(latencies), 1),
+        "p99_ms": 1000 * latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+        "drops": sum(client.drops for client in clients),
+        "resumes": sum(client.resumes for client in clients),
+        "resume_failed": sum(client.resume_failed for client in clients),
+        "resets": proxy.resets if proxy else 0,
+        "stalls": proxy.stalls if proxy else 0,
+    }
+
+
+def print_stats(label, stats):
+    print(f"[{label}] {stats['games']:.0f}판, {stats['games_per_sec']:.1f}판/초 | "
+          f"게임당 받은 프레임 {stats['frames_per_game']:.1f} (메시지 {stats['messages_per_game']:.1f}), "
+          f"보낸 메시지 {stats['sent_per_game']:.1f} | "
+          f"라운드 지연 평균 {stats['latency_ms']:.2f}ms, p99 {stats['p99_ms']:.2f}ms")
+    if stats["resets"] or stats["drops"]:
+        attempts = stats["resumes"] + stats["resume_failed"]
+        rate = stats["resumes"] / attempts * 100 if attempts else 0.0
+        print(f"    리셋 {stats['resets']}번, 게임 중 끊김 {stats['drops']}번, "
+              f"재접속 성공 {stats['resumes']}/{attempts} ({rate:.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="루프백 부하 생성기")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--spawn", action="store_true", help="루프백에 서버를 직접 띄워서 측정")
+    parser.add_argument("--rooms", type=int, default=50, help="동시에 진행할 방 수")
+    parser.add_argument("--games", type=int, default=1000, help="끝낼 게임 수")
+    parser.add_argument("--room-size", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=1, help="--spawn으로 띄운 서버의 묶음 경매 카드 수")
+    parser.add_argument("--think", type=float, default=0.0, help="응답 전 평균 대기 시간(초)")
+    parser.add_argument("--no-pipeline", action="store_true", help="파이프라인 옵션 없이 접속")
+    parser.add_argument("--compare", action="store_true", help="파이프라인을 끈 경우와 켠 경우를 비교")
+    parser.add_argument("--baseline", action="store_true", help="장애 프록시 없이도 돌려 처리량 저하를 비교")
+    parser.add_argument("--seed", type=int, help="장애 프록시의 난수 시드")
+    add_impairment_arguments(parser)
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    impairment = impairment_from_args(args)
+    if not impairment.enabled():
+        impairment = None
+    conditions = [None, impairment] if args.baseline and impairment else [impairment]
+    modes = [False, True] if args.compare else [not args.no_pipeline]
+    results = {}
+    for pipeline in modes:
+        for condition in conditions:
+            process = None
+            port = args.port
+            if args.spawn:
+                port = free_port()
+                process = spawn_server(port, "--room-size", str(args.room_size), "--batch", str(args.batch))
+            try:
+                stats = asyncio.run(run_load(args.host, port, args.rooms, args.games, args.room_size,
+                                             pipeline, args.think, impairment=condition, seed=args.seed))
+            finally:
+                if process is not None:
+                    process.kill()
+                    process.wait()
+            results[pipeline, condition] = stats
+            label = "파이프라인" if pipeline else "기존 방식"
+            if condition is not None:
+                label += f" / {condition.describe()}"
+            print_stats(label, stats)
+
+        if len(conditions) > 1:
+            clean, impaired = results[pipeline, None], results[pipeline, impairment]
+            print(f"  처리량 {clean['games_per_sec']:.1f} -> {impaired['games_per_sec']:.1f}판/초 "
+                  f"({impaired['games_per_sec'] / clean['games_per_sec'] * 100:.0f}%), "
+                  f"라운드 지연 {clean['latency_ms']:.2f} -> {impaired['latency_ms']:.2f}ms")
+
+    if args.compare:
+        plain, piped = results[False, impairment], results[True, impairment]
+        print(f"게임당 받은 프레임 {plain['frames_per_game']:.1f} -> {piped['frames_per_game']:.1f} "
+              f"({piped['frames_per_game'] / plain['frames_per_game'] * 100:.0f}%), "
+              f"라운드 지연 {plain['latency_ms']:.2f} -> {piped['latency_ms']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# memory.py
+"""
+방별 메모리 계측 (tracemalloc):
+- 켜 두면 방 하나의 일(방 만들기, 메시지 수신과 처리)을 하는 동안 늘어난 할당량을 그 방 몫으로 쌓습니다.
+  이벤트 루프 하나에서 한 번에 한 방씩 처리하므로 전후 차이가 곧 그 방이 남긴 메모리입니다.
+- 소켓, 스트림 버퍼처럼 방 밖에서 생기는 할당은 파일별 통계를 종류별로 묶은 breakdown으로 봅니다.
+- tracemalloc 자체가 할당마다 기록을 남기므로 측정할 때만 켭니다. (서버의 --memory 옵션)
+"""
+import contextlib
+import json
+import os
+import socket
+import tracemalloc
+
+# 할당이 일어난 파일 -> 종류 (나머지는 "기타")
+CATEGORIES = {
+    "socket.py": "연결 (소켓/버퍼)",
+    "selector_events.py": "연결 (소켓/버퍼)",
+    "selectors.py": "연결 (소켓/버퍼)",
+    "streams.py": "연결 (소켓/버퍼)",
+    "transports.py": "연결 (소켓/버퍼)",
+    "base_events.py": "연결 (소켓/버퍼)",
+    "events.py": "연결 (소켓/버퍼)",
+    "player.py": "Player/Card",
+    "cards.py": "Player/Card",
+    "room.py": "방 상태",
+    "auction.py": "방 상태",
+    "protocol.py": "메시지 문자열",
+    "server.py": "서버 (좌석/세션)",
+    "ratelimit.py": "수신 제한",
+    "bots.py": "봇",
+}
+
+
+class MemoryAccounting:
+    """
+    방 번호별 순증 메모리 기록:
+    - charge(room_id) 블록 안에서 늘어난(줄어든) 할당량을 그 방에 더합니다.
+    - open()으로 등록한 방만 기록하고, 방이 끝나면 release()로 지웁니다.
+    - 다른 방의 블록 안에서 다시 charge하면 바깥 방 몫에 포함됩니다.
+    """
+    def __init__(self, frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.usage = {}           # 방 번호 -> 순증 바이트
+        self.current = None       # 지금 재고 있는 방 번호
+
+    @contextlib.contextmanager
+    def charge(self, room_id):
+        if self.current is not None:
+            yield
+            return
+        self.current = room_id
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            self.current = None
+            if room_id in self.usage:
+                self.usage[room_id] += tracemalloc.get_traced_memory()[0] - before
+
+    def open(self, room_id):
+        self.usage.setdefault(room_id, 0)
+
+    def release(self, room_id):
+        self.usage.pop(room_id, None)
+
+    def breakdown(self):
+        """지금 살아 있는 할당을 종류별로 합산 (할당 수가 많으면 오래 걸림)"""
+        totals = {}
+        for stat in tracemalloc.take_snapshot().statistics("filename"):
+            name = os.path.basename(stat.traceback[0].filename)
+            category = CATEGORIES.get(name, "기타")
+            totals[category] = totals.get(category, 0) + stat.size
+        return totals
+
+    def report(self, connections=0, detail=True):
+        """JSON으로 보낼 수 있는 계측 결과"""
+        traced, peak = tracemalloc.get_traced_memory()
+        rooms = len(self.usage)
+        charged = sum(self.usage.values())
+        report = {
+            "rooms": rooms,
+            "connections": connections,
+            "traced": traced,
+            "peak": peak,
+            "room_bytes": charged,
+            "bytes_per_room": charged / rooms if rooms else 0,
+            "max_room_bytes": max(self.usage.values(), default=0),
+        }
+        if detail:
+            report["breakdown"] = self.breakdown()
+        return report
+
+
+def format_report(report):
+    lines = [
+        f"추적 중인 메모리 {report['traced'] / 1024 / 1024:.2f}MB "
+        f"(최대 {report['peak'] / 1024 / 1024:.2f}MB), "
+        f"방 {report['rooms']}개, 연결 {report['connections']}개",
+        f"방별 순증: 평균 {report['bytes_per_room']:.0f} bytes, 최대 {report['max_room_bytes']} bytes",
+    ]
+    for category, size in sorted(report.get("breakdown", {}).items(), key=lambda item: -item[1]):
+        lines.append(f"  {category:<14} {size / 1024:10.1f} KB")
+    return "\n".join(lines)
+
+
+def request_report(control_path, detail=True):
+    """실행 중인 서버(--memory, --control)에 계측 결과를 요청"""
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.connect(control_path)
+    conn.sendall(b"MEMORY\n" if detail else b"MEMORY_BRIEF\n")
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    conn.close()
+    return json.loads(b"".join(chunks))
@@ -0,0 +1,257 @@
+# netproxy.py
+"""
+네트워크 장애 흉내 프록시 (외부 서비스 없이 로컬에서):
+- 클라이언트/봇과 서버 사이에 끼어 TCP 연결을 그대로 전달하면서 지연, 지터, 대역폭 제한,
+  늦게 쓰기(한 조각을 붙잡아 뒤 조각이 줄줄이 밀림), 조각 나눠 쓰기, 연결 리셋을 넣습니다.
+- TCP는 한 연결 안의 바이트 순서를 지키므로 연결 안에서 순서를 뒤섞지는 않습니다.
+  대신 방향별/연결별로 따로 늦어져서 다른 플레이어의 메시지보다 늦게 도착하는 순서 바뀜이 생깁니다.
+- 예) python netproxy.py --listen 5001 --upstream 127.0.0.1:5000 --latency 80 --jitter 20
+      python client.py  (서버 주소를 127.0.0.1:5001로)
+  loadgen.py의 --latency 같은 옵션을 주면 같은 프록시를 부하 생성기 안에서 띄워 측정합니다.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+READ_SIZE = 65536
+QUEUE_LIMIT = 64          # 방향별로 붙잡아 둘 조각 수 (차면 읽기를 멈춰 보내는 쪽에 역압이 걸림)
+
+
+class Impairment:
+    """
+    장애 설정 (시간은 초, 대역폭은 방향별 바이트/초, 0이면 끔):
+    - latency, jitter: 조각마다 latency ± jitter만큼 늦게 씀
+    - bandwidth: 방향별 전송 속도 상한 (앞 조각을 다 보낼 때까지 다음 조각을 읽지 않음)
+    - stall, stall_time: stall 확률로 조각 하나를 stall_time만큼 더 붙잡음 (재전송 지연 흉내)
+    - split: 이 확률로 조각을 몇 개로 나눠 따로 씀 (받는 쪽의 줄 나누기 확인용)
+    - reset_rate: 연결마다 초당 리셋 확률 (평균 1/reset_rate초 뒤 양쪽 연결을 RST로 끊음)
+    """
+    def __init__(self, latency=0.0, jitter=0.0, bandwidth=0, stall=0.0, stall_time=0.2,
+                 split=0.0, reset_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.stall = stall
+        self.stall_time = stall_time
+        self.split = split
+        self.reset_rate = reset_rate
+
+    def enabled(self):
+        return any((self.latency, self.jitter, self.bandwidth, self.stall, self.split, self.reset_rate))
+
+    def delay(self, rng):
+        return max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+
+    def describe(self):
+        parts = [f"지연 {self.latency * 1000:.0f}±{self.jitter * 1000:.0f}ms"]
+        if self.bandwidth:
+            parts.append(f"대역폭 {self.bandwidth / 1024:.0f}KB/s")
+        if self.stall:
+            parts.append(f"늦게 쓰기 {self.stall:.0%} ({self.stall_time * 1000:.0f}ms)")
+        if self.split:
+            parts.append(f"나눠 쓰기 {self.split:.0%}")
+        if self.reset_rate:
+            parts.append(f"리셋 평균 {1 / self.reset_rate:.0f}초마다")
+        return ", ".join(parts)
+
+
+class Pipe:
+    """
+    한 방향 전달: 읽은 조각마다 도착 시각을 정해 큐에 넣고, 시각이 되면 순서대로 씀
+    대역폭을 넘거나 큐가 차면 읽기를 멈추므로 소켓 버퍼가 차서 보내는 쪽도 실제로 느려집니다.
+    """
+    def __init__(self, reader, writer, impairment, rng, proxy):
+        self.reader = reader
+        self.writer = writer
+        self.impairment = impairment
+        self.rng = rng
+        self.proxy = proxy
+        self.queue = asyncio.Queue(QUEUE_LIMIT)
+        self.link_free = 0.0      # 대역폭 제한: 앞 조각을 다 보내는 시각
+        self.last_due = 0.0       # 앞 조각보다 먼저 도착하지 않도록
+
+    def schedule(self, size):
+        imp = self.impairment
+        now = time.monotonic()
+        sent = now
+        if imp.bandwidth:
+            sent = self.link_free = max(now, self.link_free) + size / imp.bandwidth
+        due = sent + imp.delay(self.rng)
+        if imp.stall and self.rng.random() < imp.stall:
+            due += imp.stall_time
+            self.proxy.stalls += 1
+        due = max(due, self.last_due)
+        self.last_due = due
+        return due
+
+    async def pump(self):
+        while True:
+            wait = self.link_free - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            data = await self.reader.read(READ_SIZE)
+            if not data:
+                await self.queue.put(None)
+                return
+            self.proxy.bytes += len(data)
+            await self.queue.put((self.schedule(len(data)), data))
+
+    def fragments(self, data):
+        if len(data) < 2 or not self.impairment.split or self.rng.random() >= self.impairment.split:
+            return [data]
+        cuts = sorted(self.rng.sample(range(1, len(data)), min(2, len(data) - 1)))
+        return [data[i:j] for i, j in zip([0, *cuts], [*cuts, len(data)])]
+
+    async def deliver(self):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                # 보내는 쪽이 닫았으면 받는 쪽에도 EOF를 전달
+                if self.writer.can_write_eof() and not self.writer.is_closing():
+                    self.writer.write_eof()
+                return
+            due, data = item
+            wait = due - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            pieces = self.fragments(data)
+            for i, piece in enumerate(pieces):
+                if i:
+                    await asyncio.sleep(0.001)
+                self.writer.write(piece)
+                await self.writer.drain()
+
+
+class NetProxy:
+    """listen 포트로 들어온 연결마다 upstream에 연결을 열어 양방향으로 장애를 넣어 전달"""
+    def __init__(self, upstream_host, upstream_port, impairment, host="127.0.0.1", port=0, seed=None):
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.impairment = impairment
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.server = None
+        self.links = {}           # 전달 중인 연결의 처리 태스크 -> (클라이언트 쪽, 서버 쪽 writer)
+        self.connections = 0
+        self.resets = 0
+        self.stalls = 0
+        self.bytes = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self):
+        """
+        남은 연결을 모두 끊고 처리 태스크가 스스로 끝나길 기다림
+        (루프가 닫히며 처리 태스크를 취소하면 asyncio가 오류 로그를 남김)
+        """
+        if self.server is not None:
+            self.server.close()
+        for client_writer, server_writer in list(self.links.values()):
+            client_writer.transport.abort()
+            server_writer.transport.abort()
+        if self.links:
+            await asyncio.wait(list(self.links), timeout=5)
+        if self.server is not None:
+            await self.server.wait_closed()
+
+    async def handle(self, client_reader, client_writer):
+        try:
+            server_reader, server_writer = await asyncio.open_connection(self.upstream_host,
+                                                                         self.upstream_port)
+        except OSError:
+            client_writer.transport.abort()
+            return
+        self.connections += 1
+        handler = asyncio.current_task()
+        self.links[handler] = (client_writer, server_writer)
+        rng = random.Random(self.rng.random())
+        pipes = [Pipe(client_reader, server_writer, self.impairment, rng, self),
+                 Pipe(server_reader, client_writer, self.impairment, rng, self)]
+        timer = None
+        if self.impairment.reset_rate:
+            timer = asyncio.get_running_loop().call_later(
+                rng.expovariate(self.impairment.reset_rate), self.reset, client_writer, server_writer)
+        tasks = [asyncio.create_task(job()) for pipe in pipes for job in (pipe.pump, pipe.deliver)]
+        try:
+            await asyncio.gather(*tasks)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.links.pop(handler, None)
+            if timer is not None:
+                timer.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            client_writer.transport.abort()
+            server_writer.transport.abort()
+
+    def reset(self, client_writer, server_writer):
+        """양쪽 연결을 RST로 끊음 (아직 전달하지 못한 조각은 버려짐)"""
+        self.resets += 1
+        client_writer.transport.abort()
+        server_writer.transport.abort()
+
+
+def parse_address(text):
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def add_impairment_arguments(parser):
+    """netproxy.py와 loadgen.py가 함께 쓰는 장애 옵션 (시간은 ms)"""
+    parser.add_argument("--latency", type=float, default=0.0, help="방향별 지연(ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="지연에 더하고 빼는 최대 폭(ms)")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="방향별 대역폭(KB/s, 0이면 제한 없음)")
+    parser.add_argument("--stall", type=float, default=0.0, help="조각 하나를 더 붙잡을 확률 (0~1)")
+    parser.add_argument("--stall-time", type=float, default=200.0, help="붙잡는 시간(ms)")
+    parser.add_argument("--split", type=float, default=0.0, help="조각을 나눠 쓸 확률 (0~1)")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="연결마다 초당 리셋 확률")
+
+
+def impairment_from_args(args):
+    return Impairment(args.latency / 1000, args.jitter / 1000, args.bandwidth * 1024, args.stall,
+                      args.stall_time / 1000, args.split, args.reset_rate)
+
+
+async def serve(proxy):
+    port = await proxy.start()
+    print(f"프록시 127.0.0.1:{port} -> {proxy.upstream_host}:{proxy.upstream_port} "
+          f"({proxy.impairment.describe()})")
+    last = None
+    try:
+        while True:
+            await asyncio.sleep(10)
+            counts = (proxy.connections, proxy.resets, proxy.stalls, proxy.bytes)
+            if counts != last:
+                last = counts
+                print(f"연결 {proxy.connections}개, 리셋 {proxy.resets}번, "
+                      f"늦게 쓰기 {proxy.stalls}번, 전달 {proxy.bytes / 1024:.1f}KB")
+    finally:
+        await proxy.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네트워크 장애 흉내 TCP 프록시")
+    parser.add_argument("--listen", default="127.0.0.1:5001", help="받을 주소 (호스트:포트)")
+    parser.add_argument("--upstream", default="127.0.0.1:5000", help="게임 서버 주소 (호스트:포트)")
+    parser.add_argument("--seed", type=int, help="같은 장애를 재현할 난수 시드")
+    add_impairment_arguments(parser)
+    args = parser.parse_args()
+
+    host, port = parse_address(args.listen)
+    upstream_host, upstream_port = parse_address(args.upstream)
+    proxy = NetProxy(upstream_host, upstream_port, impairment_from_args(args), host, port, args.seed)
+    try:
+        asyncio.run(serve(proxy))
+    except KeyboardInterrupt:
+        print("프록시를 종료합니다.")
+
+
+if __name__ == "__main__":
+    main()
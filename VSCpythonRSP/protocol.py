@@ -0,0 +1,56 @@
+# protocol.py
+"""
+메시지 프레임 규칙:
+- 모든 메시지는 "명령:값:값..." 형태의 문자열이며 줄바꿈(\n) 하나로 끝납니다.
+- TCP는 메시지 경계를 보존하지 않으므로 받는 쪽은 LineBuffer로 줄 단위로 잘라서 처리합니다.
+- 파이프라인: 접속할 때 "PLAYER:이름:PIPELINE"처럼 옵션을 붙인 클라이언트에게는 서버가 한 번에 보내는
+  메시지들을 "|"로 이어 한 줄(프레임)로 보냅니다. (예: "AUCTION_RESULT:WIN:150:가위|AUCTION_CARD:보")
+  결과와 다음 입력 요청이 한 번에 도착하므로 라운드마다 보내는 프레임과 깨어나는 횟수가 줄어듭니다.
+"""
+ENCODING = "utf-8"
+PIPELINE = "PIPELINE"   # 접속 메시지에 붙이는 파이프라인 옵션
+SEPARATOR = "|"         # 한 프레임 안의 메시지 구분자 (이름 등 값에는 쓸 수 없음)
+
+
+def encode(message):
+    """메시지 문자열을 전송용 바이트(줄바꿈 포함)로 변환"""
+    return (message + "\n").encode(ENCODING)
+
+
+def encode_batch(messages):
+    """여러 메시지를 한 프레임으로 이어 붙여 변환 (파이프라인)"""
+    return encode(SEPARATOR.join(messages))
+
+
+def split_frame(frame):
+    """받은 프레임 한 줄을 메시지 목록으로 나눔 (파이프라인이 아니면 메시지 하나)"""
+    return frame.split(SEPARATOR)
+
+
+class LineBuffer:
+    """recv()로 받은 조각들을 모아 완성된 메시지 줄만 꺼내 주는 버퍼"""
+    def __init__(self):
+        self.data = b""
+
+    def feed(self, chunk):
+        """받은 바이트를 추가하고 완성된 메시지 리스트를 반환"""
+        self.data += chunk
+        *lines, self.data = self.data.split(b"\n")
+        return [line.decode(ENCODING).rstrip("\r") for line in lines]
+
+
+# 배틀 상태는 카드 목록 대신 종류별 장수로 보냅니다. ("2,1,3" = 가위 2, 바위 1, 보 3)
+CARD_TYPES = ("가위", "바위", "보")
+
+
+def encode_counts(names):
+    """카드 이름 목록을 종류별 장수 문자열로 변환"""
+    counts = [0] * len(CARD_TYPES)
+    for name in names:
+        counts[CARD_TYPES.index(name)] += 1
+    return ",".join(map(str, counts))
+
+
+def decode_counts(text):
+    """종류별 장수 문자열을 {카드 이름: 장수} 딕셔너리로 변환"""
+    return dict(zip(CARD_TYPES, map(int, text.split(","))))
@@ -0,0 +1,54 @@
+# ratelimit.py
+import time
+
+
+class TokenBucket:
+    """
+    토큰 버킷:
+    - 초당 rate개씩 토큰이 채워지고 최대 burst개까지 쌓입니다.
+    - 메시지 하나(또는 연결 하나)를 처리할 때마다 토큰을 하나 사용합니다.
+    """
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def allow(self, cost=1):
+        """토큰이 충분하면 사용하고 True, 부족하면 False"""
+        self.refill(time.monotonic())
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+    def wait_time(self, cost=1):
+        """토큰이 cost개 쌓일 때까지 기다려야 하는 시간(초)"""
+        return max(0.0, (cost - self.tokens) / self.rate)
+
+    def is_full(self):
+        self.refill(time.monotonic())
+        return self.tokens >= self.burst
+
+
+class SourceLimits:
+    """
+    접속 IP별 제한:
+    - 새 연결 속도(토큰 버킷)와 동시 연결 수를 제한합니다.
+    - 같은 IP의 모든 연결이 메시지 토큰 버킷 하나를 함께 사용합니다.
+    """
+    __slots__ = ("connections", "messages", "active")
+
+    def __init__(self, settings):
+        self.connections = TokenBucket(settings.IP_CONN_RATE, settings.IP_CONN_BURST)
+        self.messages = TokenBucket(settings.IP_MSG_RATE, settings.IP_MSG_BURST)
+        self.active = 0
+
+    def is_idle(self):
+        return self.active == 0 and self.connections.is_full() and self.messages.is_full()
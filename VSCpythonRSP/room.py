@@ -0,0 +1,350 @@
+# room.py
+import settings
+from auction import Auction, load_deck, resolve_batch_bids, round_robin_pairings
+from cards import Card
+from player import Player
+from protocol import decode_counts, encode_counts
+
+# 각 카드가 이기는 카드
+BEATS = {"가위": "보", "바위": "가위", "보": "바위"}
+# 상대 입장에서 본 결과
+FLIP = {"WIN": "LOSE", "LOSE": "WIN", "TIE": "TIE"}
+
+
+def determine_winner(card1, card2):
+    """가위바위보 승패 판정 (card1 기준으로 'TIE' / 'WIN' / 'LOSE' 반환)"""
+    if card1 == card2:
+        return "TIE"
+    elif BEATS.get(card1) == card2:
+        return "WIN"
+    else:
+        return "LOSE"
+
+
+class GameRoom:
+    """
+    N인용 게임 방 클래스:
+    - 좌석(seat) 번호마다 Player 객체로 포인트와 보유 카드를 관리합니다.
+    - 경매 페이즈: 모든 좌석에 같은 카드를 공개하고, 봉인 입찰을 모두 받은 뒤 한 번에 낙찰자를 정합니다.
+      batch가 2 이상이면 카드 여러 장을 한꺼번에 공개하고 카드별 입찰가 목록을 한 번에 받습니다. (묶음 경매)
+    - 배틀 페이즈: 라운드 로빈 대진표에 따라 두 명씩 가위바위보 대결을 하고,
+      진 쪽의 카드만 삭제합니다. 카드가 남은 사람이 한 명이 되면 게임이 끝납니다.
+    - 소켓을 직접 다루지 않고 send(seat, message) 콜백으로만 메시지를 내보내므로
+      입출력 방식은 서버가 정합니다.
+    """
+    def __init__(self, names, send, mode=settings.AUCTION_MODE, deck=settings.AUCTION_DECK,
+                 batch=settings.AUCTION_BATCH):
+        self.players = [Player(name) for name in names]
+        self.send = send
+        self.auction = Auction(mode, load_deck(deck))
+        self.batch = batch         # 한 번에 공개하는 경매 카드 수
+        self.phase = "WAITING"
+        self.waiting = {}          # 좌석 -> 기다리는 명령 ("BID" / "CARD")
+        self.inputs = {}           # 좌석 -> 이번 라운드에 받은 값
+        self.current_lots = []     # 이번 경매 라운드에 공개한 카드
+        self.auction_round = 0     # 지금까지 경매한 카드 수
+        self.battle_round = 0
+        self.schedule = []         # 남은 라운드 로빈 대진
+        self.schedule_seats = ()   # 대진표를 만들 때의 생존 좌석
+        self.pairs = []            # 이번 배틀 라운드의 대진
+        self.synced = {}           # 좌석 -> 지난 라운드에 카드 장수를 동기화한 상대 좌석
+        self.finished = False
+        self.winner = None
+
+    def snapshot(self):
+        """
+        방 상태를 기본 자료형 튜플로 변환 (무중단 재시작용).
+        카드는 종류별 장수 문자열로, 경매 카드는 덱 항목 번호로 줄여서 저장합니다.
+        """
+        auction = self.auction
+        lot_index = auction.deck.lot_index
+        return (
+            auction.mode, auction.deck.name, self.batch, self.phase,
+            tuple((p.name, p.points, encode_counts(card.name for card in p.cards))
+                  for p in self.players),
+            tuple(lot_index[lot] for lot in self.current_lots),
+            tuple(lot_index[lot] for lot in auction.upcoming), auction.pile,
+            self.auction_round, self.battle_round,
+            self.schedule, self.schedule_seats, self.pairs, self.synced,
+            self.waiting, self.inputs, self.finished, self.winner,
+        )
+
+    @classmethod
+    def restore(cls, state, send):
+        """snapshot()으로 만든 튜플에서 방을 다시 만듭니다."""
+        (mode, deck, batch, phase, players, current_lots, upcoming, pile,
+         auction_round, battle_round, schedule, schedule_seats, pairs, synced,
+         waiting, inputs, finished, winner) = state
+        room = cls([name for name, _, _ in players], send, mode, deck, batch)
+        lots = room.auction.deck.lots
+        for player, (_, points, counts) in zip(room.players, players):
+            player.points = points
+            player.cards = [Card(name) for name, count in decode_counts(counts).items()
+                            for _ in range(count)]
+        room.phase = phase
+        room.current_lots = [lots[i] for i in current_lots]
+        room.auction.upcoming.extend(lots[i] for i in upcoming)
+        room.auction.pile = pile
+        room.auction_round = auction_round
+        room.battle_round = battle_round
+        room.schedule = schedule
+        room.schedule_seats = schedule_seats
+        room.pairs = pairs
+        room.synced = synced
+        room.waiting = waiting
+        room.inputs = inputs
+        room.finished = finished
+        room.winner = winner
+        return room
+
+    def start(self):
+        """각 좌석에 상대방 정보를 보내고 경매 페이즈를 시작합니다."""
+        for seat, player in enumerate(self.players):
+            others = [p.name for p in self.players if p is not player]
+            self.send(seat, f"OPPONENT:{','.join(others)}")
+        self.next_auction_round()
+
+    def handle(self, seat, message):
+        """
+        좌석에서 들어온 메시지 처리:
+        - 지금 그 좌석에 기다리는 명령이 아니면 무시하고 False를 반환합니다.
+        - 모든 좌석의 입력이 모이면 이번 라운드를 정산하고 다음 라운드를 시작합니다.
+        """
+        cmd, _, value = message.partition(":")
+        if self.waiting.get(seat) != cmd:
+            return False
+        del self.waiting[seat]
+        self.inputs[seat] = value
+
+        if not self.waiting:
+            if self.phase == "AUCTION":
+                self.resolve_auction()
+            elif self.phase == "BATTLE":
+                self.resolve_battle()
+        return True
+
+    # ---------------- 경매 페이즈 ----------------
+
+    def can_continue_auction(self):
+        """한 명이라도 최소 입찰 포인트가 남아 있으면 경매를 계속합니다."""
+        return (self.auction_round < settings.MAX_AUCTION_ROUNDS and
+                any(p.points >= settings.MIN_BID for p in self.players))
+
+    def next_auction_round(self):
+        # 최대 라운드 수를 넘지 않는 만큼 카드를 뽑음 (비복원 추출 덱이 바닥나면 더 적게)
+        lots = []
+        if self.can_continue_auction():
+            count = min(self.batch, settings.MAX_AUCTION_ROUNDS - self.auction_round)
+            while len(lots) < count:
+                lot = self.auction.get_current_card()
+                if lot is None:
+                    break
+                lots.append(lot)
+        self.current_lots = lots
+        if not lots:
+            self.start_battle_phase()
+            return
+
+        self.phase = "AUCTION"
+        self.inputs = {}
+        kind = "BIDS" if self.batch > 1 else "BID"
+        message = self.auction_message()
+        self.waiting = {seat: kind for seat in range(len(self.players))}
+        for seat in range(len(self.players)):
+            self.send(seat, message)
+
+    def auction_message(self):
+        """이번 경매 라운드의 입찰 요청"""
+        if self.batch > 1:
+            # 묶음 경매: "AUCTION_LOTS:가위,바위/희귀,보" -> "BIDS:100,0,200"
+            return "AUCTION_LOTS:" + ",".join(
+                f"{lot.name}/{lot.tier}" if lot.tier else lot.name for lot in self.current_lots)
+        # 희귀도가 있는 덱이면 "AUCTION_CARD:바위:희귀"처럼 뒤에 붙여 보냄
+        lot = self.current_lots[0]
+        return f"AUCTION_CARD:{lot.name}:{lot.tier}" if lot.tier else f"AUCTION_CARD:{lot.name}"
+
+    def parse_bids(self, seat):
+        """
+        묶음 경매 입찰가 목록 확인: 카드 수와 개수가 다르거나, 음수가 있거나,
+        합계가 보유 포인트를 넘으면 이번 라운드는 모두 포기(0)로 처리
+        """
+        count = len(self.current_lots)
+        try:
+            bids = [int(value) for value in self.inputs.get(seat, "").split(",")]
+        except ValueError:
+            return [0] * count
+        if len(bids) != count or min(bids) < 0 or sum(bids) > self.players[seat].points:
+            return [0] * count
+        return bids
+
+    def parse_bid(self, seat):
+        """
+        잘못된 입찰(숫자가 아니거나 보유 포인트 초과)은 포기(0)로 처리
+        (최소 입찰가 미만은 resolve_sealed_bids가 포기로 처리)
+        """
+        try:
+            bid = int(self.inputs.get(seat, 0))
+        except ValueError:
+            return 0
+        if 0 <= bid <= self.players[seat].points:
+            return bid
+        return 0
+
+    def resolve_auction(self):
+        seats = range(len(self.players))
+        if self.batch > 1:
+            bid_vectors = [self.parse_bids(seat) for seat in seats]
+        else:
+            bid_vectors = [[self.parse_bid(seat)] for seat in seats]
+        results = resolve_batch_bids(bid_vectors, self.auction.mode,
+                                     reserve=settings.MIN_BID,
+                                     priority=self.auction_round)
+        self.auction_round += len(self.current_lots)
+
+        for lot, (winner, price) in zip(self.current_lots, results):
+            if winner is not None:
+                self.players[winner].points -= price
+                self.players[winner].add_card(Card(lot.name, lot.tier))
+
+        # 결과에 카드 이름도 붙여서, 입찰 요청을 받지 못한 채 재접속한 클라이언트도 낙찰 카드를 알 수 있게 함
+        for seat in seats:
+            if self.batch > 1:
+                # "AUCTION_RESULTS:WIN/150/가위,LOSE/120/바위" (카드 순서대로 결과/낙찰가/카드)
+                self.send(seat, "AUCTION_RESULTS:" + ",".join(
+                    f"{'WIN' if seat == winner else 'LOSE'}/{price}/{lot.name}"
+                    for lot, (winner, price) in zip(self.current_lots, results)))
+            else:
+                winner, price = results[0]
+                self.send(seat, f"AUCTION_RESULT:{'WIN' if seat == winner else 'LOSE'}:{price}:"
+                                f"{self.current_lots[0].name}")
+
+        self.next_auction_round()
+
+    # ---------------- 배틀 페이즈 ----------------
+
+    def alive_seats(self):
+        return [seat for seat, player in enumerate(self.players) if player.cards]
+
+    def card_counts(self, seat):
+        return encode_counts(card.name for card in self.players[seat].cards)
+
+    def opponent_of(self, seat):
+        """이번 배틀 라운드의 상대 좌석 (부전이면 None)"""
+        for a, b in self.pairs:
+            if seat == a:
+                return b
+            if seat == b:
+                return a
+        return None
+
+    def start_battle_phase(self):
+        self.phase = "BATTLE"
+        self.next_battle_round()
+
+    def next_battle_round(self):
+        alive = self.alive_seats()
+        if len(alive) <= 1 or self.battle_round >= settings.MAX_BATTLE_ROUNDS:
+            self.end_game()
+            return
+
+        # 탈락자가 생기면 남은 좌석으로 대진표를 다시 만듭니다.
+        if not self.schedule or tuple(alive) != self.schedule_seats:
+            self.schedule = round_robin_pairings(alive)
+            self.schedule_seats = tuple(alive)
+        self.pairs = self.schedule.pop(0)
+        self.battle_round += 1
+
+        self.inputs = {}
+        self.waiting = {}
+        synced = {}
+        for a, b in self.pairs:
+            for seat, opponent in ((a, b), (b, a)):
+                self.waiting[seat] = "CARD"
+                synced[seat] = opponent
+                # 바로 전 라운드와 같은 상대면 클라이언트가 결과로 장수를 이미 갱신해 둠
+                self.send(seat, self.battle_message(opponent, self.synced.get(seat) != opponent))
+        self.synced = synced
+
+    def battle_message(self, opponent, full=True):
+        if not full:
+            return "BATTLE_START:TURN"
+        return f"BATTLE_START:TURN:{self.card_counts(opponent)}:{self.players[opponent].name}"
+
+    def take_card(self, seat):
+        """선택한 카드를 찾아 반환 (보유하지 않은 카드면 첫 번째 카드로 대체)"""
+        cards = self.players[seat].cards
+        name = self.inputs.get(seat)
+        return next((card for card in cards if card.name == name), cards[0])
+
+    def resolve_battle(self):
+        for a, b in self.pairs:
+            card_a = self.take_card(a)
+            card_b = self.take_card(b)
+            result = determine_winner(card_a.name, card_b.name)
+
+            # 결과에 따라 진 쪽의 카드만 제거
+            if result == "WIN":
+                self.players[b].cards.remove(card_b)
+            elif result == "LOSE":
+                self.players[a].cards.remove(card_a)
+
+            # 결과만 보내면 진 쪽 카드 한 장이 빠진다는 변화(델타)를 클라이언트가 적용
+            self.send(a, f"BATTLE_RESULT:{result}:{card_a.name}:{card_b.name}")
+            self.send(b, f"BATTLE_RESULT:{FLIP[result]}:{card_b.name}:{card_a.name}")
+
+        self.next_battle_round()
+
+    # ---------------- 입력 제한 시간 ----------------
+
+    def default_input(self, seat, kind):
+        """제한 시간 안에 답하지 않은 좌석의 입력: 입찰은 포기(0), 카드는 첫 번째 카드"""
+        if kind == "BIDS":
+            return ",".join("0" for _ in self.current_lots)
+        if kind == "BID":
+            return "0"
+        return self.players[seat].cards[0].name
+
+    def expire(self):
+        """
+        라운드 제한 시간이 지났을 때: 아직 답하지 않은 좌석을 기본 입력으로 처리해 라운드를 정산합니다.
+        처리한 좌석 목록을 반환합니다.
+        """
+        late = list(self.waiting.items())
+        for seat, kind in late:
+            self.handle(seat, f"{kind}:{self.default_input(seat, kind)}")
+        return [seat for seat, _ in late]
+
+    # ---------------- 재접속 ----------------
+
+    def resync(self, seat):
+        """
+        재접속한 좌석에 보낼 메시지 목록:
+        - STATE:포인트:카드 장수 (배틀 중이면 뒤에 상대의 카드 장수와 이름을 붙임)
+        - 그 좌석의 입력을 기다리는 중이면 지금 라운드의 입력 요청
+        끊긴 동안 받지 못한 메시지(경매 카드, 상대 장수)에 기대지 않도록 필요한 값을 모두 다시 보내고,
+        다음 배틀 라운드에도 상대의 카드 장수를 처음부터 다시 보내도록 동기화 기록을 지웁니다.
+        """
+        self.synced.pop(seat, None)
+        state = f"STATE:{self.players[seat].points}:{self.card_counts(seat)}"
+        opponent = self.opponent_of(seat) if self.phase == "BATTLE" else None
+        if opponent is not None:
+            state += f":{self.card_counts(opponent)}:{self.players[opponent].name}"
+        messages = [state]
+        kind = self.waiting.get(seat)
+        if kind in ("BID", "BIDS"):
+            messages.append(self.auction_message())
+        elif kind == "CARD":
+            messages.append(self.battle_message(opponent))
+        return messages
+
+    # ---------------- 게임 종료 ----------------
+
+    def end_game(self):
+        """카드가 가장 많이 남은 좌석이 승리 (동률이면 앞 좌석)"""
+        self.phase = "GAME_OVER"
+        self.waiting = {}
+        self.finished = True
+        self.winner = max(range(len(self.players)),
+                          key=lambda seat: (len(self.players[seat].cards), -seat))
+        for seat in range(len(self.players)):
+            self.send(seat, f"GAME_OVER:{self.players[self.winner].name}")
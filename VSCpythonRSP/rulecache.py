@@ -0,0 +1,131 @@
+# rulecache.py
+"""
+규칙/정책 데이터 바이너리 캐시:
+- 복원 추출 경매 덱의 별칭 표(확률, 별칭 인덱스)와 봇이 쓰는 카드 상성표를 미리 계산해 파일 하나에 적어 둡니다.
+- 서버는 파일을 mmap으로 열어 memoryview로 바로 읽으므로, 시작할 때 표를 계산하거나 파싱하지 않습니다.
+  (여러 프로세스가 같은 파일을 열면 페이지 캐시를 함께 씀)
+- 머리말의 지문(설정 내용의 crc32)이 지금 설정과 다르거나 파일이 없으면 캐시를 쓰지 않고 설정에서 계산합니다.
+- 만들기: python rulecache.py  (settings.py의 덱이나 상성을 바꾼 뒤 다시 실행)
+
+파일 배치 (리틀 엔디언):
+  머리말   매직 4바이트, 버전 u16, 덱 수 u16, 지문 u32
+  덱 목록  덱마다 이름 16바이트, 항목 수 u32, 시작 위치 u32
+  본문     덱마다 확률 float64[항목 수], 별칭 int32[항목 수] (8바이트 정렬)
+           상성표 int8[카드 수 * 카드 수] (이기면 1, 지면 -1)
+"""
+import functools
+import mmap
+import os
+import struct
+import zlib
+import settings
+from protocol import CARD_TYPES
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.bin")
+MAGIC = b"RPSR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+DECK_ENTRY = struct.Struct("<16sII")
+
+
+def fingerprint():
+    """캐시 내용을 정하는 설정의 지문 (설정이 바뀌면 캐시를 다시 만들어야 함)"""
+    from room import BEATS
+    source = repr((VERSION, settings.AUCTION_DECKS, BEATS, CARD_TYPES))
+    return zlib.crc32(source.encode("utf-8"))
+
+
+def build_matchup():
+    """상성표: matchup[i * n + j]는 CARD_TYPES[i]가 CARD_TYPES[j]를 이기면 1, 지면 -1"""
+    from room import BEATS
+    n = len(CARD_TYPES)
+    table = bytearray(n * n)
+    for i, mine in enumerate(CARD_TYPES):
+        for j, theirs in enumerate(CARD_TYPES):
+            if BEATS[mine] == theirs:
+                table[i * n + j] = 1
+            elif BEATS[theirs] == mine:
+                table[i * n + j] = 0xFF      # int8로 읽으면 -1
+    return memoryview(bytes(table)).cast("b")
+
+
+def build(path=CACHE_PATH):
+    """settings의 덱으로 별칭 표를 계산해 캐시 파일을 씀. 쓴 바이트 수를 반환"""
+    from auction import AuctionDeck
+
+    decks = []
+    for name, config in settings.AUCTION_DECKS.items():
+        if not config.get("replacement", True):
+            continue          # 비복원 추출 덱은 방마다 더미를 섞으므로 미리 계산할 표가 없음
+        if len(name.encode("utf-8")) > 16:
+            raise ValueError(f"덱 이름이 너무 깁니다: {name}")
+        deck = AuctionDeck(config["weights"], config.get("tiers"), True, name)
+        decks.append((name, deck.table))
+
+    offset = HEADER.size + DECK_ENTRY.size * len(decks)
+    index, body = [], bytearray()
+    for name, table in decks:
+        start = offset + len(body)
+        start += -start % 8
+        body += bytes(start - offset - len(body))
+        body += struct.pack(f"<{len(table.prob)}d", *table.prob)
+        body += struct.pack(f"<{len(table.alias)}i", *table.alias)
+        index.append(DECK_ENTRY.pack(name.encode("utf-8"), len(table.prob), start))
+    body += build_matchup().cast("B").tobytes()
+
+    data = HEADER.pack(MAGIC, VERSION, len(decks), fingerprint()) + b"".join(index) + body
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return len(data)
+
+
+class RuleCache:
+    """mmap으로 연 캐시 파일: tables는 덱 이름 -> (확률, 별칭) memoryview, matchup은 상성표"""
+    def __init__(self, mapped):
+        self.mapped = mapped      # memoryview가 살아 있는 동안 mmap을 닫지 않도록 붙잡아 둠
+        view = memoryview(mapped)
+        _, _, count, _ = HEADER.unpack_from(view)
+        self.tables = {}
+        end = HEADER.size + DECK_ENTRY.size * count
+        for i in range(count):
+            raw_name, size, start = DECK_ENTRY.unpack_from(view, HEADER.size + DECK_ENTRY.size * i)
+            prob = view[start:start + 8 * size].cast("d")
+            alias = view[start + 8 * size:start + 12 * size].cast("i")
+            self.tables[raw_name.rstrip(b"\0").decode("utf-8")] = (prob, alias)
+            end = start + 12 * size
+        n = len(CARD_TYPES)
+        self.matchup = view[end:end + n * n].cast("b")
+
+
+@functools.lru_cache(maxsize=None)
+def load(path=CACHE_PATH):
+    """캐시 파일을 mmap으로 열어 RuleCache를 반환 (없거나 설정과 다르면 None, 프로세스마다 한 번)"""
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapped) < HEADER.size:
+        return None
+    magic, version, _, stamp = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION or stamp != fingerprint():
+        return None
+    return RuleCache(mapped)
+
+
+@functools.lru_cache(maxsize=None)
+def matchup():
+    """봇 정책이 쓰는 상성표 (캐시가 있으면 mmap에서, 없으면 계산)"""
+    cache = load()
+    return cache.matchup if cache is not None else build_matchup()
+
+
+def main():
+    size = build()
+    print(f"규칙 캐시를 만들었습니다: {CACHE_PATH} ({size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
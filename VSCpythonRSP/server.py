@@ -1,24 +1,198 @@
-import socket
-import json
-import threading
 import time
-from game_logic import GameLogic
-from player import Player
-from auction import Auction
+STARTED = time.perf_counter()         # 시작 시간 보고의 기준 (아래 import부터 잼)
+import argparse
+import asyncio
+import collections
+import contextlib
+import os
+import socket
+import settings
+from bots import POLICIES, BotPool
+from protocol import PIPELINE, SEPARATOR, encode, encode_batch
+from ratelimit import SourceLimits, TokenBucket
+# 방(room/auction/player), 스냅샷(pickle), 메모리 계측(tracemalloc), json은 처음 쓸 때 import
+# (접속을 받기 시작할 때까지의 시간과 봇/워커 프로세스의 메모리를 줄이기 위해)
+IMPORTED = time.perf_counter()
+
+NO_CHARGE = contextlib.nullcontext()  # 메모리 계측을 끈 경우
+
+
+def unread_input(reader):
+    """
+    StreamReader가 소켓에서 받아 두었지만 아직 읽어 가지 않은 바이트 (인계 스냅샷용).
+    StreamReader에는 이를 꺼낼 공개 API가 없어 내부 버퍼(_buffer, CPython의 bytearray)를 읽습니다.
+    내부 속성은 이 함수에서만 다루며, 읽기를 멈춘(pause_reading) 뒤에만 부릅니다.
+    """
+    return bytes(getattr(reader, "_buffer", b""))
+
+
+class ClientSeat:
+    """
+    사람 플레이어 좌석: asyncio 스트림으로 메시지를 주고받습니다.
+    연결이 끊기면 writer가 None인 상태로 남아 RESUME 재접속을 기다립니다.
+    """
+    is_bot = False
+
+    def __init__(self, name, writer, source=None, reader=None, pipeline=False):
+        self.name = name
+        self.writer = writer
+        self.reader = reader
+        self.pipeline = pipeline  # 방 메시지를 모아 한 프레임으로 받는 클라이언트인지
+        self.outbox = []          # 파이프라인: 이번 처리에서 보낼 메시지
+        self.pending = b""        # 읽었지만 속도 제한/대기열 때문에 아직 방에 넘기지 못한 줄
+        self.bucket = TokenBucket(settings.MSG_RATE, settings.MSG_BURST)
+        self.source = source      # 같은 IP가 함께 쓰는 제한 (제외 IP면 None)
+        self.strikes = 0          # 속도 제한을 넘긴 횟수
+        self.session = None
+        self.seat = None
+        self.grace_timer = None   # 연결이 끊긴 뒤 봇이 이어받기까지의 타이머
+
+    def send(self, message):
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(encode(message))
+
+    def queue(self, message):
+        """방 메시지: 파이프라인 클라이언트면 flush() 때 한 프레임으로 모아서 보냄"""
+        if self.pipeline:
+            self.outbox.append(message)
+        else:
+            self.send(message)
+
+    def flush(self):
+        if self.outbox:
+            if self.writer is not None and not self.writer.is_closing():
+                self.writer.write(encode_batch(self.outbox))
+            self.outbox.clear()
+
+
+class RoomSession:
+    """
+    게임 방 하나와 그 방에 앉은 좌석(사람/봇)들을 묶어서 관리:
+    - 좌석에서 온 메시지는 크기가 제한된 수신 대기열(inbox)에 쌓였다가 한 번에 처리됩니다.
+    - 사람 좌석마다 재접속용 세션 토큰과 마지막으로 보낸 메시지를 기억합니다.
+    - 파이프라인 좌석에 보낼 메시지는 처리가 끝날 때 flush()로 한 번에 내보냅니다.
+      (결과 메시지 뒤에 다음 경매 카드/배틀 턴이 같은 프레임으로 붙어 감)
+    """
+    def __init__(self, room_id, seats, mode, room_state=None, tokens=None,
+                 deck=settings.AUCTION_DECK, batch=settings.AUCTION_BATCH):
+        from room import GameRoom
+        self.room_id = room_id
+        self.seats = seats
+        if room_state is None:
+            self.room = GameRoom([seat.name for seat in seats], self.send, mode, deck, batch)
+        else:
+            self.room = GameRoom.restore(room_state, self.send)
+        if tokens is None:
+            # secrets.token_hex(8)과 같음 (secrets가 끌어오는 hashlib 등을 import하지 않으려고 직접 씀)
+            tokens = [None if seat.is_bot else os.urandom(8).hex() for seat in seats]
+        self.tokens = tokens
+        self.last_sent = [None] * len(seats)
+        self.inbox = collections.deque()
+        self.space = None         # 대기열이 가득 찼을 때 읽기를 멈춘 좌석들이 기다리는 이벤트
+        self.scheduled = False
+        self.round = None         # 입력 제한 시간을 맞춘 라운드 (단계, 경매 라운드, 배틀 라운드)
+        self.deadline = None      # 이번 라운드의 입력 제한 시간 타이머
+
+    def current_round(self):
+        room = self.room
+        return room.phase, room.auction_round, room.battle_round
+
+    def send(self, seat, message):
+        self.last_sent[seat] = message
+        self.seats[seat].queue(message)
+
+    def flush(self):
+        for seat in self.seats:
+            if not seat.is_bot:
+                seat.flush()
+
 
 class GameServer:
-    def __init__(self, host='0.0.0.0', port=5000):
-        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        # 타임아웃 설정 추가
-        self.server.settimeout(1.0)
+    """
+    게임 서버:
+    - 하나의 asyncio 이벤트 루프에서 모든 연결과 방을 처리합니다.
+    - 접속한 플레이어는 대기실(lobby)에 모이고, 방 인원이 차면 게임이 시작됩니다.
+    - bot_wait초 안에 사람이 다 모이지 않으면 빈자리를 봇 풀의 봇으로 채웁니다.
+    - 라운드마다 round_deadline초 안에 답하지 않은 좌석은 기본 입력(포기/첫 번째 카드)으로 처리합니다.
+    - control_path를 주면 유닉스 소켓으로 무중단 재시작(인계) 요청을 받습니다.
+    """
+    def __init__(self, host='0.0.0.0', port=5000, room_size=settings.ROOM_SIZE,
+                 mode=settings.AUCTION_MODE, bot_wait=settings.BOT_WAIT,
+                 bot_policy=settings.BOT_POLICY, control_path=None,
+                 snapshot_path=settings.SNAPSHOT_PATH, deck=settings.AUCTION_DECK,
+                 memory=False, batch=settings.AUCTION_BATCH, round_deadline=settings.ROUND_DEADLINE):
+        if not 2 <= room_size <= settings.MAX_ROOM_SIZE:
+            raise ValueError(f"방 인원은 2 ~ {settings.MAX_ROOM_SIZE}명이어야 합니다: {room_size}")
+        if batch < 1:
+            raise ValueError(f"한 번에 공개할 경매 카드 수는 1 이상이어야 합니다: {batch}")
+        self.host = host
+        self.port = port
+        self.room_size = room_size
+        self.mode = mode
+        self.deck = deck
+        self.batch = batch
+        self.bot_wait = bot_wait
+        self.round_deadline = round_deadline
+        self.bot_pool = BotPool(bot_policy, self.post)
+        self.control_path = control_path
+        self.snapshot_path = snapshot_path
+        self.server = None
+        self.control = None       # 인계 요청을 받는 유닉스 소켓
+        self.lobby = []           # 방 배정을 기다리는 사람 좌석
+        self.lobby_timer = None   # 봇 채우기 타이머
+        self.sessions = {}        # 방 번호 -> RoomSession
+        self.tokens = {}          # 세션 토큰 -> RoomSession
+        self.next_room_id = 1
+        self.tasks = set()        # 복원한 연결의 수신 태스크
+        self.sources = {}         # IP -> SourceLimits
+        self.pruned_at = float("-inf")  # 마지막으로 IP 기록을 정리한 시각
+        self.exempt = set(settings.RATE_LIMIT_EXEMPT)
+        self.rejected = 0         # 연결 단계에서 거절한 수
+        self.ignored = 0          # 방이 기다리지 않는 메시지라서 대기열에 넣지 않은 수
+        self.frozen = False       # 인계 중에는 방 처리를 멈춤
+        self.memory = None        # 방별 메모리 계측
+        if memory:
+            from memory import MemoryAccounting
+            self.memory = MemoryAccounting()
+        self.first_connection = None  # 첫 연결을 받은 시각 (시작 시간 보고용)
+        self.running = True  # 서버 실행 상태 플래그
+
+    def start(self, takeover=None, restore=None):
+        """서버 시작 및 클라이언트 연결 대기 (Ctrl+C면 serve 안에서 정리한 뒤 KeyboardInterrupt가 올라옴)"""
+        asyncio.run(self.serve(takeover, restore))
+
+    async def serve(self, takeover=None, restore=None):
+        """
+        takeover: 이전 프로세스의 제어 소켓 경로 (리스닝 소켓과 연결을 넘겨받음)
+        restore: 스냅샷 파일 경로 (연결 없이 상태만 복원, 클라이언트는 RESUME으로 재접속)
+        """
+        listen_sock = None
+        if takeover or restore:
+            import snapshot
+            started = time.perf_counter()
+            fds = snapshot.request_takeover(takeover) if takeover else []
+            state = snapshot.load(self.snapshot_path if takeover else restore)
+            if fds:
+                listen_sock = socket.socket(fileno=fds[0])
+            await self.restore_state(state, fds[1:])
+            print(f"상태 복원 완료: 방 {len(self.sessions)}개, "
+                  f"{(time.perf_counter() - started) * 1000:.1f}ms")
+
         try:
-            self.server.bind((host, port))
-            self.server.listen(2)
-            self.clients = []
-            self.player_names = []
-            self.running = True  # 서버 실행 상태 플래그
-            print(f"서버가 {host}:{port}에서 시작되었습니다.")
+            if listen_sock is not None:
+                self.server = await asyncio.start_server(
+                    self.handle_client_connection, sock=listen_sock,
+                    limit=settings.MAX_FRAME_BYTES)
+            else:
+                self.server = await asyncio.start_server(
+                    self.handle_client_connection, self.host, self.port,
+                    reuse_address=True, backlog=max(self.room_size, 100),
+                    limit=settings.MAX_FRAME_BYTES)
+            print(f"서버가 {self.host}:{self.port}에서 시작되었습니다.")
+            listening = time.perf_counter()
+            print(f"시작 시간: import {(IMPORTED - STARTED) * 1000:.1f}ms, "
+                  f"접속 대기까지 {(listening - STARTED) * 1000:.1f}ms (인터프리터 시작 제외)")
+            asyncio.get_running_loop().call_soon(self.warm_up)
             # 현재 서버의 IP 주소 출력
             hostname = socket.gethostname()
             local_ip = socket.gethostbyname(hostname)
@@ -27,223 +201,706 @@ class GameServer:
             print(f"서버 시작 오류: {e}")
             raise e
 
-    def start(self):
-        """서버 시작 및 클라이언트 연결 대기"""
+        if self.control_path:
+            self.open_control_socket()
+
         print("클라이언트 연결 대기 중...")
         try:
-            while self.running and len(self.clients) < 2:
-                try:
-                    client_socket, address = self.server.accept()
-                    # 클라이언트 소켓에도 타임아웃 설정
-                    client_socket.settimeout(5.0)
-                    
-                    # 클라이언트 연결 처리를 별도 스레드로 실행
-                    client_thread = threading.Thread(
-                        target=self.handle_client_connection,
-                        args=(client_socket, address)
-                    )
-                    client_thread.start()
-                    
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    print(f"클라이언트 연결 처리 중 오류 발생: {e}")
-                    continue
-                    
-        except Exception as e:
-            print(f"서버 실행 중 오류 발생: {e}")
+            await self.server.serve_forever()
         finally:
+            # Ctrl+C로 취소되어도 이벤트 루프가 아직 돌고 있을 때 방과 연결을 닫음
+            # (asyncio.run이 끝난 뒤에는 연결을 닫아도 보낼 루프가 없음)
             self.cleanup()
 
-    def handle_client_connection(self, client_socket, address):
+    def warm_up(self):
+        """
+        접속을 받기 시작한 뒤 게임 모듈과 규칙 데이터를 미리 올려 둠
+        (첫 방이 그 시간을 치르지 않고, 메모리 계측에서도 첫 방 몫으로 잡히지 않게)
+        """
+        import rulecache
+        from auction import load_deck
+        started = time.perf_counter()
+        load_deck(self.deck)
+        source = "규칙 캐시" if rulecache.load() is not None else "설정에서 계산 (python rulecache.py로 캐시 생성)"
+        print(f"게임 모듈/규칙 데이터 준비: {(time.perf_counter() - started) * 1000:.1f}ms, {source}")
+
+    async def handle_client_connection(self, reader, writer):
         """클라이언트 연결 처리"""
+        if self.first_connection is None:
+            self.first_connection = time.perf_counter()
+            print(f"첫 연결 수락: 시작 후 {(self.first_connection - STARTED) * 1000:.1f}ms")
+        address = writer.get_extra_info("peername")
+        allowed, source = self.admit(address[0])
+        if not allowed:
+            # 파싱 전에 바로 끊어서 비용을 최소화
+            self.rejected += 1
+            writer.transport.abort()
+            return
+
+        client = None
         try:
-            # 클라이언트로부터 플레이어 이름 받기
-            player_name = client_socket.recv(1024).decode()
-            if not player_name:
-                raise ConnectionError("플레이어 이름을 받지 못했습니다.")
-                
-            self.clients.append(client_socket)
-            self.player_names.append(player_name)
-            
-            print(f"플레이어 {player_name}가 접속했습니다. ({address})")
-            print(f"현재 접속자 수: {len(self.clients)}/2")
-            
-            # 두 번째 플레이어가 접속하면 게임 시작
-            if len(self.clients) == 2:
-                self.start_game()
-                
+            line = await asyncio.wait_for(reader.readline(), settings.HANDSHAKE_TIMEOUT)
+            text = line.decode().strip()
+            # "PLAYER:이름:옵션..." / "RESUME:토큰:옵션..." (옵션이 없으면 예전 클라이언트)
+            fields = text.split(":")
+            pipeline = PIPELINE in fields[2:]
+
+            if fields[0] == "RESUME" and len(fields) > 1:
+                # 세션 토큰으로 진행 중이던 자리에 다시 앉기
+                client = ClientSeat("", writer, source, reader, pipeline)
+                if not self.resume_client(client, fields[1]):
+                    writer.write(encode("RESUME_FAILED"))
+                    return
+            else:
+                # 클라이언트로부터 플레이어 이름 받기 (구분자 문자는 제거)
+                player_name = fields[1] if fields[0] == "PLAYER" and len(fields) > 1 else text
+                for separator in (":", ",", SEPARATOR):
+                    player_name = player_name.replace(separator, "")
+                if not player_name:
+                    raise ConnectionError("플레이어 이름을 받지 못했습니다.")
+                client = ClientSeat(player_name, writer, source, reader, pipeline)
+                print(f"플레이어 {player_name}가 접속했습니다. ({address})")
+                self.join_lobby(client)
+
+            await self.read_client(client)
+
+        except asyncio.CancelledError:
+            pass  # 서버 종료로 취소됨: 연결만 정리하고 조용히 끝냄
         except Exception as e:
-            print(f"클라이언트 {address} 처리 중 오류 발생: {e}")
-            self.remove_client(client_socket)
+            print(f"클라이언트 {address} 처리 중 오류 발생: {type(e).__name__} {e}")
+        finally:
+            self.drop_connection(client, source, writer)
 
-    def remove_client(self, client_socket):
-        """클라이언트 연결 제거"""
-        try:
-            if client_socket in self.clients:
-                idx = self.clients.index(client_socket)
-                self.clients.remove(client_socket)
-                self.player_names.pop(idx)
-                client_socket.close()
-        except:
-            pass
+    async def read_client(self, client):
+        """연결이 끊길 때까지 메시지를 읽어 방으로 전달"""
+        while self.running:
+            # 한 줄이 MAX_FRAME_BYTES를 넘으면 readline이 ValueError를 냄
+            line = await client.reader.readline()
+            if not line:
+                break
+            # 아래에서 기다리는 동안 인계되면 이 줄도 스냅샷에 넘어가도록 좌석에 붙여 둠
+            client.pending = line
+            await self.take_message_token(client)
+            session = client.session
+            # 방 대기열이 가득 차 있으면 버리지 않고 빌 때까지 이 좌석의 읽기를 멈춤 (TCP 흐름 제어)
+            while session is not None and len(session.inbox) >= settings.ROOM_QUEUE_SIZE:
+                if session.space is None:
+                    session.space = asyncio.Event()
+                await session.space.wait()
+                session = client.session
+            client.pending = b""
+            if session is not None:
+                with self.charge(session.room_id):
+                    self.post(session, client.seat, line.decode().strip())
 
-    def cleanup(self):
-        """서버 및 연결된 소켓들을 정리"""
-        print("\n서버 정리 중...")
-        self.running = False
-        
-        # 모든 클라이언트 연결 종료
-        for client in self.clients[:]:  # 복사본으로 반복
+    def drop_connection(self, client, source, writer):
+        if source is not None:
+            source.active -= 1
+        if client is not None and client.writer is writer:
             self.remove_client(client)
-            
-        # 서버 소켓 종료
-        try:
-            self.server.close()
-        except:
-            pass
-        print("서버가 종료되었습니다.")
+        writer.close()
 
-    def send_to_client(self, client_socket, message):
-        """안전한 메시지 전송"""
-        try:
-            client_socket.send(message.encode())
-            return True
-        except Exception as e:
-            print(f"메시지 전송 실패: {e}")
-            self.remove_client(client_socket)
+    # ---------------- 수신 제한 ----------------
+
+    def admit(self, ip):
+        """IP별 새 연결 속도와 동시 연결 수 확인. (허용 여부, IP 제한 객체) 반환"""
+        if ip in self.exempt:
+            return True, None
+        source = self.sources.get(ip)
+        if source is None:
+            if len(self.sources) >= settings.MAX_TRACKED_IPS:
+                self.prune_sources()
+                if len(self.sources) >= settings.MAX_TRACKED_IPS:
+                    # 기록할 자리가 없으면 새 IP는 받지 않음 (이미 기록된 IP는 그대로 제한을 받으며 접속 가능)
+                    return False, None
+            source = self.sources[ip] = SourceLimits(settings)
+        if source.active >= settings.MAX_CONN_PER_IP or not source.connections.allow():
+            return False, None
+        source.active += 1
+        return True, source
+
+    def prune_sources(self):
+        """
+        연결이 없고 토큰이 가득 찬 IP 기록은 지워도 제한 효과가 같으므로 정리.
+        기록 전체를 훑으므로 여러 IP가 한꺼번에 몰려도 PRUNE_INTERVAL초에 한 번만 합니다.
+        """
+        now = time.monotonic()
+        if now - self.pruned_at < settings.PRUNE_INTERVAL:
+            return
+        self.pruned_at = now
+        for ip in [ip for ip, source in self.sources.items() if source.is_idle()]:
+            del self.sources[ip]
+
+    def throttle(self, client):
+        """
+        연결별, IP별 메시지 토큰 확인 (메시지를 해석하기 전에 호출).
+        허용되면 0, 아니면 토큰이 찰 때까지 기다려야 하는 시간(초)을 반환합니다.
+        토큰이 넉넉히 다시 찼다면 잠깐 몰렸던 것으로 보고 위반 횟수를 초기화합니다.
+        """
+        if not client.bucket.allow():
+            return client.bucket.wait_time()
+        if client.source is not None and not client.source.messages.allow():
+            client.bucket.tokens += 1  # IP 쪽에서 막혔으면 연결 토큰은 돌려줌 (다시 시도할 때 두 번 쓰지 않게)
+            return client.source.messages.wait_time()
+        if client.bucket.tokens >= client.bucket.burst / 2:
+            client.strikes = 0
+        return 0
+
+    async def take_message_token(self, client):
+        """
+        메시지 하나를 처리할 토큰을 얻을 때까지 기다림.
+        메시지를 버리면 방이 그 입력을 계속 기다리게 되므로, 제한을 넘으면 토큰이 찰 때까지
+        읽기를 멈춰 TCP 흐름 제어로 보내는 쪽을 늦춘 뒤 처리합니다.
+        기다린 뒤에도 토큰을 실제로 얻어야 넘어가므로 계속 몰아 보내도 처리 속도는 rate를 넘지 않습니다.
+        """
+        delay = self.throttle(client)
+        if not delay:
+            return
+        client.strikes += 1
+        if client.strikes > settings.MAX_STRIKES:
+            raise ConnectionError("메시지 전송 속도 제한을 계속 초과했습니다.")
+        while delay:
+            await asyncio.sleep(delay)
+            delay = self.throttle(client)
+
+    # ---------------- 방 배정 ----------------
+
+    def join_lobby(self, client):
+        """대기실에 넣고, 인원이 차면 방을 시작 (아니면 봇 채우기 타이머 예약)"""
+        self.lobby.append(client)
+        print(f"현재 대기 인원: {len(self.lobby)}/{self.room_size}")
+
+        if len(self.lobby) >= self.room_size:
+            self.start_room(self.lobby[:self.room_size])
+            del self.lobby[:self.room_size]
+            self.cancel_lobby_timer()
+        else:
+            self.schedule_lobby_timer()
+
+    def schedule_lobby_timer(self):
+        if self.lobby and self.lobby_timer is None and self.bot_wait >= 0:
+            loop = asyncio.get_running_loop()
+            self.lobby_timer = loop.call_later(self.bot_wait, self.fill_with_bots)
+
+    def cancel_lobby_timer(self):
+        if self.lobby_timer is not None:
+            self.lobby_timer.cancel()
+            self.lobby_timer = None
+
+    def fill_with_bots(self):
+        """대기 시간이 지나면 빈자리를 봇으로 채워 방을 시작"""
+        self.lobby_timer = None
+        if not self.lobby:
+            return
+        bots = self.bot_pool.acquire(self.room_size - len(self.lobby))
+        print(f"대기 시간 초과: 봇 {len(bots)}명을 채워 게임을 시작합니다.")
+        self.start_room(self.lobby + bots)
+        self.lobby = []
+
+    def start_room(self, seats):
+        with self.charge(self.next_room_id):
+            session = RoomSession(self.next_room_id, seats, self.mode,
+                                  deck=self.deck, batch=self.batch)
+            self.next_room_id += 1
+            self.add_session(session)
+            print(f"방 {session.room_id} 게임 시작: {', '.join(seat.name for seat in seats)}")
+            # 사람 좌석에는 재접속용 토큰을 먼저 알려줌
+            # (파이프라인 좌석에는 토큰, 상대 정보, 첫 경매 카드가 한 프레임으로 감)
+            for idx, token in enumerate(session.tokens):
+                if token is not None:
+                    session.seats[idx].queue(f"SESSION:{token}")
+            session.room.start()
+            session.flush()
+        self.arm_deadline(session)
+
+    def add_session(self, session):
+        for idx, seat in enumerate(session.seats):
+            seat.session = session
+            seat.seat = idx
+        for token in session.tokens:
+            if token is not None:
+                self.tokens[token] = session
+        self.sessions[session.room_id] = session
+        if self.memory is not None:
+            self.memory.open(session.room_id)
+
+    def post(self, session, seat, message):
+        """
+        좌석의 메시지를 방의 수신 대기열에 넣음:
+        - 방이 그 좌석에 기다리는 명령이 아니면 넣지 않고 버림 (처리해도 무시될 메시지가 자리를 차지하지 않게)
+        - 대기열 크기는 사람 좌석의 읽기 쪽(read_client)에서 맞추고, 봇의 응답은 방이 요청한 것이므로 항상 넣음
+        """
+        if session.room.waiting.get(seat) != message.partition(":")[0]:
+            self.ignored += 1
             return False
+        session.inbox.append((seat, message))
+        if not session.scheduled and not self.frozen:
+            session.scheduled = True
+            asyncio.get_running_loop().call_soon(self.drain, session)
+        return True
 
-    def start_game(self):
-        """게임 시작 및 진행"""
-        try:
-            # 각 플레이어에게 상대방 정보 전송
-            for i in range(2):
-                opponent_name = self.player_names[1-i]
-                if not self.send_to_client(self.clients[i], f"OPPONENT:{opponent_name}"):
+    def drain(self, session):
+        """
+        대기열의 메시지를 방에 전달하고, 게임이 끝났으면 방을 정리.
+        처리 중에 새로 들어온 메시지(봇의 응답 등)는 다음 차례로 미뤄
+        방 하나가 이벤트 루프를 오래 붙잡지 않게 합니다.
+        """
+        session.scheduled = False
+        if self.frozen:
+            return
+        with self.charge(session.room_id):
+            for _ in range(len(session.inbox)):
+                if session.room_id not in self.sessions:
                     return
+                seat, message = session.inbox.popleft()
+                session.room.handle(seat, message)
+                if session.room.finished:
+                    session.flush()
+                    self.close_room(session)
+                    return
+            session.flush()
+        self.wake_readers(session)
+        self.arm_deadline(session)
+        if session.inbox:
+            session.scheduled = True
+            asyncio.get_running_loop().call_soon(self.drain, session)
 
-            # 경매 페이즈 시작
-            self.auction_phase()
-            
-        except Exception as e:
-            print(f"게임 시작 중 오류 발생: {e}")
-            self.cleanup()
+    def arm_deadline(self, session):
+        """새 라운드가 시작됐으면 입력 제한 시간 타이머를 다시 맞춤"""
+        current = session.current_round()
+        if current == session.round:
+            return
+        session.round = current
+        if session.deadline is not None:
+            session.deadline.cancel()
+            session.deadline = None
+        if session.room.waiting and self.round_deadline > 0:
+            loop = asyncio.get_running_loop()
+            session.deadline = loop.call_later(self.round_deadline, self.expire_round, session)
 
-    def auction_phase(self):
-        """경매 페이즈 진행"""
-        auction = Auction()
-        player1_points = 1000
-        player2_points = 1000
-        
-        while player1_points >= 100 or player2_points >= 100:
-            try:
-                current_card = auction.get_current_card()
-                
-                # 현재 카드 정보 전송
-                for client in self.clients:
-                    if not self.send_to_client(client, f"AUCTION_CARD:{current_card.name}"):
-                        return
-
-                # 입찰가 수집
-                bids = []
-                for i, client in enumerate(self.clients):
-                    try:
-                        bid_data = client.recv(1024).decode()
-                        if not bid_data:
-                            raise ConnectionError(f"플레이어 {i+1}의 연결이 끊겼습니다.")
-                        bid = int(bid_data.split(":")[1])
-                        bids.append(bid)
-                    except Exception as e:
-                        print(f"입찰가 수집 중 오류 발생: {e}")
-                        return
-
-                # 승자 결정 및 포인트 차감
-                winner_idx = 0 if bids[0] > bids[1] else 1
-                if winner_idx == 0:
-                    player1_points -= bids[0]
-                else:
-                    player2_points -= bids[1]
-
-                # 결과 전송
-                for i, client in enumerate(self.clients):
-                    result = "WIN" if i == winner_idx else "LOSE"
-                    if not self.send_to_client(client, f"AUCTION_RESULT:{result}:{bids[winner_idx]}"):
-                        return
-
-            except Exception as e:
-                print(f"경매 진행 중 오류 발생: {e}")
+    def expire_round(self, session):
+        """
+        입력 제한 시간이 지나면 답하지 않은 좌석을 기본 입력으로 처리하고 다음 라운드로 넘어감
+        (말없이 멈춘 플레이어 한 명 때문에 방 전체가 기다리지 않게)
+        """
+        session.deadline = None
+        if session.room_id not in self.sessions or self.frozen:
+            return
+        if session.inbox:
+            # 이미 도착한 답을 먼저 반영 (그 답으로 라운드가 끝났으면 새 타이머가 걸려 있음)
+            self.drain(session)
+            if session.room_id not in self.sessions or session.deadline is not None:
+                return
+        with self.charge(session.room_id):
+            for seat in session.room.waiting:
+                if not session.seats[seat].is_bot:
+                    session.seats[seat].send("NOTICE:입력 시간이 지나 경매는 포기, 배틀은 첫 번째 카드로 처리합니다.")
+            late = session.room.expire()
+            print(f"방 {session.room_id}: 입력 시간 초과 "
+                  f"({', '.join(session.seats[seat].name for seat in late)})")
+            session.flush()
+            if session.room.finished:
+                self.close_room(session)
                 return
+        self.wake_readers(session)
+        self.arm_deadline(session)
 
-        # 배틀 페이즈로 전환
-        self.battle_phase()
+    def wake_readers(self, session):
+        """대기열에 자리가 났으면 (또는 방이 끝났으면) 읽기를 멈춘 좌석들을 깨움"""
+        if session.space is not None and (len(session.inbox) < settings.ROOM_QUEUE_SIZE
+                                          or session.room_id not in self.sessions):
+            session.space.set()
+            session.space = None
 
-    def battle_phase(self):
-        """배틀 페이즈 진행"""
-        # 플레이어들의 카드 정보 초기화
-        player1_cards = ["가위", "바위", "보"] * 2
-        player2_cards = ["가위", "바위", "보"] * 2
+    def close_room(self, session):
+        """게임이 끝난 방의 봇은 반납하고 사람 연결은 종료"""
+        self.sessions.pop(session.room_id, None)
+        self.wake_readers(session)
+        if session.deadline is not None:
+            session.deadline.cancel()
+            session.deadline = None
+        if self.memory is not None:
+            self.memory.release(session.room_id)
+        for token in session.tokens:
+            self.tokens.pop(token, None)
+        for seat in session.seats:
+            seat.session = None
+            if seat.is_bot:
+                self.bot_pool.release(seat)
+            else:
+                if seat.grace_timer is not None:
+                    seat.grace_timer.cancel()
+                if seat.writer is not None:
+                    seat.writer.close()
 
-        while player1_cards and player2_cards:
-            try:
-                # 각 플레이어에게 상대방의 카드 정보와 함께 배틀 시작 알림
-                if not (self.send_to_client(self.clients[0], f"BATTLE_START:TURN:{','.join(player2_cards)}") and
-                       self.send_to_client(self.clients[1], f"BATTLE_START:TURN:{','.join(player1_cards)}")):
-                    return
+    def charge(self, room_id):
+        """메모리 계측 중이면 블록 안의 할당을 방 몫으로 기록"""
+        if self.memory is None:
+            return NO_CHARGE
+        return self.memory.charge(room_id)
 
-                # 각 플레이어의 카드 선택 받기
-                cards = []
-                for i, client in enumerate(self.clients):
-                    try:
-                        card_data = client.recv(1024).decode()
-                        if not card_data:
-                            raise ConnectionError(f"플레이어 {i+1}의 연결이 끊겼습니다.")
-                        cards.append(card_data.split(":")[1])
-                    except Exception as e:
-                        print(f"카드 선택 수집 중 오류 발생: {e}")
-                        return
-
-                # 승패 판정
-                result = self.determine_winner(cards[0], cards[1])
-                
-                # 결과에 따라 카드 제거
-                if result == "P1_WIN":
-                    player2_cards.remove(cards[1])
-                elif result == "P2_WIN":
-                    player1_cards.remove(cards[0])
-                
-                # 결과 전송
-                if not (self.send_to_client(self.clients[0], 
-                                          f"BATTLE_RESULT:{result}:{cards[0]}:{cards[1]}:{','.join(player2_cards)}") and
-                       self.send_to_client(self.clients[1], 
-                                          f"BATTLE_RESULT:{result}:{cards[1]}:{cards[0]}:{','.join(player1_cards)}")):
-                    return
+    def memory_report(self, detail=True):
+        if self.memory is None:
+            return {"error": "메모리 계측이 꺼져 있습니다. (--memory)"}
+        return self.memory.report(len(self.live_clients()), detail)
 
-            except Exception as e:
-                print(f"배틀 진행 중 오류 발생: {e}")
-                return
+    # ---------------- 연결 끊김 / 재접속 ----------------
+
+    def remove_client(self, client):
+        """클라이언트 연결 제거 (게임 중이었다면 잠시 재접속을 기다린 뒤 봇이 자리를 이어받음)"""
+        if client in self.lobby:
+            self.lobby.remove(client)
+            if not self.lobby:
+                self.cancel_lobby_timer()
+            return
 
-        # 게임 종료
-        winner = "Player 2" if not player1_cards else "Player 1"
-        for client in self.clients:
-            self.send_to_client(client, f"GAME_OVER:{winner}")
-
-    def determine_winner(self, card1, card2):
-        """가위바위보 승패 판정"""
-        if card1 == card2:
-            return "TIE"
-        elif ((card1 == "가위" and card2 == "보") or
-              (card1 == "바위" and card2 == "가위") or
-              (card1 == "보" and card2 == "바위")):
-            return "P1_WIN"
+        session = client.session
+        if session is None or session.room_id not in self.sessions:
+            return
+        client.writer = None
+        client.reader = None
+        self.notify(session, f"{client.name}의 연결이 끊겼습니다. "
+                             f"{settings.RESUME_GRACE:.0f}초 안에 돌아오지 않으면 봇이 이어받습니다.")
+        self.detach(client)
+
+    def notify(self, session, message, skip=None):
+        """
+        방의 사람 좌석에 알림을 보냄. 입력 요청이 아니므로 재접속 때 다시 보낼
+        마지막 메시지(last_sent)로 기록하지 않도록 좌석에 바로 씁니다.
+        """
+        for seat in session.seats:
+            if not seat.is_bot and seat is not skip:
+                seat.send(f"NOTICE:{message}")
+
+    def detach(self, client):
+        loop = asyncio.get_running_loop()
+        client.grace_timer = loop.call_later(settings.RESUME_GRACE, self.replace_with_bot, client)
+
+    def replace_with_bot(self, client):
+        """재접속 대기 시간이 지나면 봇이 자리를 이어받음"""
+        client.grace_timer = None
+        session = client.session
+        if session is None or session.room_id not in self.sessions:
+            return
+        bot = self.bot_pool.acquire(1)[0]
+        bot.session = session
+        bot.seat = client.seat
+        session.seats[client.seat] = bot
+        client.session = None
+        print(f"방 {session.room_id}: {client.name}의 연결이 끊겨 봇이 자리를 이어받습니다.")
+        self.notify(session, f"{client.name} 대신 봇이 게임을 이어갑니다.")
+        if client.seat in session.room.waiting and session.last_sent[client.seat]:
+            bot.send(session.last_sent[client.seat])
+
+    def resume_client(self, client, token):
+        """
+        세션 토큰으로 원래 자리에 다시 앉힘:
+        - 그 사이 봇이 앉아 있었다면 봇을 돌려보내고, 다른 연결이 있었다면 끊습니다.
+        - 현재 포인트/카드와 배틀 상대의 카드 장수(STATE)를 보내고,
+          입력을 기다리던 중이면 지금 라운드의 입력 요청을 다시 보냅니다. (GameRoom.resync)
+        """
+        session = self.tokens.get(token)
+        if session is None:
+            return False
+        idx = session.tokens.index(token)
+        previous = session.seats[idx]
+        if previous.is_bot:
+            self.bot_pool.release(previous)
         else:
-            return "P2_WIN"
+            if previous.grace_timer is not None:
+                previous.grace_timer.cancel()
+            if previous.writer is not None:
+                previous.writer.close()
+            previous.session = None
+
+        player = session.room.players[idx]
+        client.name = player.name
+        client.session = session
+        client.seat = idx
+        session.seats[idx] = client
+        print(f"방 {session.room_id}: {client.name}가 다시 접속했습니다.")
+        self.notify(session, f"{client.name}가 다시 접속했습니다.", skip=client)
+
+        client.queue("RESUMED")
+        for message in session.room.resync(idx):
+            client.queue(message)
+        client.flush()
+        return True
+
+    # ---------------- 무중단 재시작 ----------------
+
+    def open_control_socket(self):
+        """인계 요청을 받을 유닉스 소켓을 열고 이벤트 루프에 등록"""
+        if not hasattr(socket, "send_fds"):
+            print("이 운영체제에서는 무중단 재시작(fd 전달)을 지원하지 않습니다.")
+            return
+        if os.path.exists(self.control_path):
+            os.unlink(self.control_path)
+        self.control = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.control.bind(self.control_path)
+        self.control.listen(1)
+        self.control.setblocking(False)
+        asyncio.get_running_loop().add_reader(self.control.fileno(), self.on_control)
+
+    def on_control(self):
+        """제어 연결을 받고, 명령은 이벤트 루프를 막지 않도록 태스크에서 읽음"""
+        try:
+            conn, _ = self.control.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(False)
+        task = asyncio.get_running_loop().create_task(self.control_command(conn))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def control_command(self, conn):
+        """TAKEOVER(인계) / SNAPSHOT(저장 후 종료) / MEMORY, MEMORY_BRIEF(메모리 보고)"""
+        loop = asyncio.get_running_loop()
+        try:
+            command = (await asyncio.wait_for(loop.sock_recv(conn, 64), 5.0)).strip()
+        except (asyncio.TimeoutError, OSError):
+            conn.close()
+            return
+        command, _, argument = command.partition(b":")
+        if command == b"TAKEOVER":
+            await self.handover(conn, argument.decode(errors="replace"))
+        elif command == b"SNAPSHOT":
+            import snapshot
+            self.freeze()
+            size = snapshot.save(self.snapshot_path, self.snapshot_state(with_connections=False)[0])
+            print(f"스냅샷 저장 완료 ({size} bytes). 서버를 종료합니다.")
+            await loop.sock_sendall(conn, b"1")
+            conn.close()
+            self.exit_after_handover()
+        elif command in (b"MEMORY", b"MEMORY_BRIEF"):
+            import json
+            await loop.sock_sendall(conn, json.dumps(self.memory_report(command == b"MEMORY")).encode())
+            conn.close()
+        else:
+            conn.close()
+
+    def freeze(self):
+        """새 연결 받기와 모든 입력 읽기, 방 처리를 멈춤"""
+        loop = asyncio.get_running_loop()
+        for sock in self.server.sockets:
+            # 리스닝 소켓은 닫지 않고 감시만 멈춰서, 그동안 온 연결은 커널 대기열에 남게 함
+            loop.remove_reader(sock.fileno())
+        loop.remove_reader(self.control.fileno())
+        self.frozen = True
+        self.cancel_lobby_timer()
+        for client in self.live_clients():
+            client.writer.transport.pause_reading()
+
+    def live_clients(self):
+        clients = [seat for session in self.sessions.values() for seat in session.seats
+                   if not seat.is_bot and seat.writer is not None]
+        return clients + [client for client in self.lobby if client.writer is not None]
+
+    async def handover(self, conn, compatibility):
+        """
+        무중단 재시작: 새 프로세스에 리스닝 소켓과 모든 연결을 넘기고 종료
+        0. 새 프로세스의 스냅샷 버전과 덱/규칙 지문이 다르면 거절하고 계속 실행
+        1. 새 연결 받기, 입력 읽기, 방 처리를 멈춤
+        2. 보내는 중이던 데이터를 모두 내보냄
+        3. 방/대기실 상태와 세션 토큰을 스냅샷 파일로 저장
+        4. 리스닝 소켓과 클라이언트 소켓을 fd 전달로 넘김
+        """
+        import snapshot
+        if compatibility != snapshot.compatibility():
+            print(f"인계 거절: 새 프로세스의 스냅샷 버전/설정 지문이 다릅니다 "
+                  f"({compatibility or '없음'} != {snapshot.compatibility()})")
+            await asyncio.get_running_loop().sock_sendall(conn, b"R")
+            conn.close()
+            return
+
+        started = time.perf_counter()
+        self.freeze()
+        await asyncio.gather(*(client.writer.drain() for client in self.live_clients()),
+                             return_exceptions=True)
+
+        state, connections = self.snapshot_state()
+        size = snapshot.save(self.snapshot_path, state)
+        fds = [self.server.sockets[0].fileno()] + [sock.fileno() for sock in connections]
+        # 모든 처리를 멈췄으므로 fd 전달은 블로킹으로 보냄 (새 프로세스가 받을 때까지)
+        conn.settimeout(5.0)
+        snapshot.send_fds(conn, fds)
+        conn.close()
+        print(f"인계 완료: 방 {len(self.sessions)}개, 연결 {len(connections)}개, "
+              f"스냅샷 {size} bytes, {(time.perf_counter() - started) * 1000:.1f}ms")
+        self.exit_after_handover()
+
+    def exit_after_handover(self):
+        """
+        소켓을 닫는 정리 과정 없이 바로 종료.
+        (새 프로세스가 같은 연결을 쓰고 있으므로 여기서 아무것도 보내거나 끊으면 안 됨.
+         제어 소켓 파일도 새 프로세스가 다시 만들므로 지우지 않음)
+        """
+        print("이전 서버 프로세스를 종료합니다.", flush=True)
+        os._exit(0)
+
+    def snapshot_state(self, with_connections=True):
+        """
+        모든 방/대기실 상태와 세션 토큰을 기본 자료형으로 모음.
+        넘겨줄 클라이언트 소켓 목록도 함께 반환하며, 스냅샷에는 그 목록의 위치(fd 번호)만 적습니다.
+        """
+        import snapshot
+        with snapshot.paused_gc():
+            return self._snapshot_state(with_connections)
+
+    def _snapshot_state(self, with_connections):
+        connections = []
+
+        def seat_state(seat):
+            if seat.is_bot:
+                return ("bot", seat.name)
+            if not with_connections or seat.writer is None:
+                return ("client", seat.name, -1, b"", seat.pipeline)
+            connections.append(seat.writer.get_extra_info("socket"))
+            # 읽었지만 방에 넘기지 못한 줄과, 소켓에서 받았지만 아직 읽지 않은 입력도 함께 넘김
+            return ("client", seat.name, len(connections) - 1,
+                    seat.pending + unread_input(seat.reader), seat.pipeline)
+
+        rooms = [(session.room_id, session.room.snapshot(),
+                  [seat_state(seat) for seat in session.seats],
+                  session.tokens, session.last_sent, list(session.inbox))
+                 for session in self.sessions.values()]
+        lobby = [seat_state(client) for client in self.lobby]
+        state = {"next_room_id": self.next_room_id, "rooms": rooms, "lobby": lobby}
+        return state, connections
+
+    async def restore_state(self, state, fds):
+        """snapshot_state()로 저장한 상태를 복원하고 넘겨받은 연결에서 다시 읽기 시작"""
+        import snapshot
+        with snapshot.paused_gc():
+            await self._restore_state(state, fds)
+
+    async def _restore_state(self, state, fds):
+        self.next_room_id = state["next_room_id"]
+        for room_id, room_state, seat_states, tokens, last_sent, inbox in state["rooms"]:
+            seats = [await self.restore_seat(seat_state, fds) for seat_state in seat_states]
+            session = RoomSession(room_id, seats, self.mode, room_state, tokens)
+            session.last_sent = last_sent
+            self.add_session(session)
+            for seat, message in inbox:
+                self.post(session, seat, message)
+            self.arm_deadline(session)
+            for seat in seats:
+                if not seat.is_bot and seat.writer is None:
+                    self.detach(seat)
+
+        for seat_state in state["lobby"]:
+            client = await self.restore_seat(seat_state, fds)
+            if client.writer is not None:
+                self.lobby.append(client)
+        self.schedule_lobby_timer()
+
+    async def restore_seat(self, seat_state, fds):
+        if seat_state[0] == "bot":
+            return self.bot_pool.acquire(1)[0]
+
+        _, name, fd_index, pending, pipeline = seat_state
+        if fd_index < 0:
+            return ClientSeat(name, None, pipeline=pipeline)
+        sock = socket.socket(fileno=fds[fd_index])
+        reader, writer = await asyncio.open_connection(sock=sock, limit=settings.MAX_FRAME_BYTES)
+        reader.feed_data(pending)
+        allowed, source = self.admit(writer.get_extra_info("peername")[0])
+        client = ClientSeat(name, writer, source if allowed else None, reader, pipeline)
+        task = asyncio.get_running_loop().create_task(self.serve_restored(client, source if allowed else None))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return client
+
+    async def serve_restored(self, client, source):
+        """넘겨받은 연결은 이름 확인 없이 바로 메시지 읽기부터 시작"""
+        writer = client.writer
+        try:
+            await self.read_client(client)
+        except asyncio.CancelledError:
+            pass  # 서버 종료로 취소됨
+        except Exception as e:
+            print(f"클라이언트 {client.name} 처리 중 오류 발생: {e}")
+        finally:
+            self.drop_connection(client, source, writer)
+
+    def cleanup(self):
+        """서버 및 연결된 소켓들을 정리"""
+        print("\n서버 정리 중...")
+        if self.memory is not None:
+            from memory import format_report
+            print(format_report(self.memory_report(detail=False)))
+        self.running = False
+        self.cancel_lobby_timer()
+
+        # 모든 클라이언트 연결 종료
+        for session in list(self.sessions.values()):
+            self.close_room(session)
+        for client in self.lobby:
+            client.writer.close()
+        self.lobby = []
+
+        # 서버 소켓 종료
+        if self.server is not None:
+            self.server.close()
+        if self.control is not None:
+            self.control.close()
+            if os.path.exists(self.control_path):
+                os.unlink(self.control_path)
+        print("서버가 종료되었습니다.")
+
+
+def int_range(low, high=None):
+    """argparse용 정수 타입: low 이상 (high가 있으면 high 이하)만 받음"""
+    def parse(text):
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"정수여야 합니다: {text}")
+        if value < low or (high is not None and value > high):
+            bounds = f"{low} ~ {high}" if high is not None else f"{low} 이상"
+            raise argparse.ArgumentTypeError(f"{bounds}이어야 합니다: {value}")
+        return value
+    return parse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="가위바위보 경매 게임 서버")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--room-size", type=int_range(2, settings.MAX_ROOM_SIZE), default=settings.ROOM_SIZE,
+                        help=f"방 하나의 인원 (2 ~ {settings.MAX_ROOM_SIZE})")
+    parser.add_argument("--mode", choices=["first", "second"], default=settings.AUCTION_MODE)
+    parser.add_argument("--deck", choices=sorted(settings.AUCTION_DECKS), default=settings.AUCTION_DECK,
+                        help="경매 카드를 뽑을 덱 (settings.AUCTION_DECKS)")
+    parser.add_argument("--batch", type=int_range(1), default=settings.AUCTION_BATCH,
+                        help="한 번에 공개할 경매 카드 수 (2 이상이면 묶음 경매)")
+    parser.add_argument("--bot-wait", type=float, default=settings.BOT_WAIT,
+                        help="빈자리를 봇으로 채우기까지 기다릴 초 (음수면 봇 없음)")
+    parser.add_argument("--round-deadline", type=float, default=settings.ROUND_DEADLINE,
+                        help="라운드마다 입력을 기다릴 초 (지나면 포기/첫 번째 카드로 처리, 0 이하면 끔)")
+    parser.add_argument("--bot-policy", choices=sorted(POLICIES), default=settings.BOT_POLICY,
+                        help="봇이 입찰과 카드를 고르는 정책")
+    parser.add_argument("--exempt-ip", action="append", default=[],
+                        help="수신 제한을 적용하지 않을 IP (부하 테스트용, 여러 번 지정 가능)")
+    parser.add_argument("--control", help="무중단 재시작 요청을 받을 유닉스 소켓 경로")
+    parser.add_argument("--snapshot", default=settings.SNAPSHOT_PATH, help="스냅샷 파일 경로")
+    parser.add_argument("--takeover", action="store_true",
+                        help="--control 경로의 이전 서버에서 소켓과 상태를 넘겨받아 시작")
+    parser.add_argument("--memory", action="store_true",
+                        help="tracemalloc으로 방별 메모리를 계측 (--control 소켓에 MEMORY를 보내 확인)")
+    parser.add_argument("--restore", help="스냅샷 파일에서 상태만 복원 (클라이언트는 RESUME으로 재접속)")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        server = GameServer()
-        server.start()
+        server = GameServer(args.host, args.port, args.room_size, args.mode,
+                            args.bot_wait, args.bot_policy, args.control, args.snapshot, args.deck, args.memory,
+                            args.batch, args.round_deadline)
+        server.exempt.update(args.exempt_ip)
+        server.start(takeover=args.control if args.takeover else None, restore=args.restore)
     except KeyboardInterrupt:
         print("\n서버가 사용자에 의해 중단되었습니다.")
     except Exception as e:
-        print(f"예상치 못한 오류 발생: {e}") 
\ No newline at end of file
+        print(f"예상치 못한 오류 발생: {e}")
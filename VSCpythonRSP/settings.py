@@ -1,3 +1,57 @@
 # settings.py
 INITIAL_POINTS = 1000
 DEFAULT_CARDS = ["가위", "바위", "보"]
+
+# 온라인 방 설정
+ROOM_SIZE = 2              # 방 하나에 앉는 인원 (2 ~ MAX_ROOM_SIZE)
+MAX_ROOM_SIZE = 16
+AUCTION_MODE = "first"     # "first": 최고가 지불, "second": 차순위가 지불(비크리 경매)
+AUCTION_BATCH = 1          # 한 번에 공개할 경매 카드 수 (2 이상이면 묶음 경매: 카드별 입찰가를 한 번에 제출)
+MIN_BID = 100              # 경매 참가 최소 포인트 (비크리 경매의 최저 낙찰가)
+MAX_AUCTION_ROUNDS = 30    # 모두가 0을 입찰해도 경매가 끝나도록 하는 상한
+MAX_BATTLE_ROUNDS = 100    # 무승부가 반복되어도 배틀이 끝나도록 하는 상한
+
+# 봇 설정
+BOT_WAIT = 10.0            # 사람이 모이지 않으면 몇 초 뒤 빈자리를 봇으로 채울지 (음수면 채우지 않음)
+BOT_POLICY = "random"      # "random" 또는 "counter"
+
+# 수신 제한 (비정상 클라이언트 차단)
+MAX_FRAME_BYTES = 256      # 메시지 한 줄의 최대 길이 (수신 버퍼도 이 크기를 기준으로 제한)
+MSG_RATE = 20              # 연결 하나가 초당 보낼 수 있는 메시지 수
+MSG_BURST = 40
+IP_MSG_RATE = 200          # 같은 IP의 모든 연결을 합친 초당 메시지 수
+IP_MSG_BURST = 400
+IP_CONN_RATE = 5           # 같은 IP에서 초당 새로 열 수 있는 연결 수
+IP_CONN_BURST = 20
+MAX_CONN_PER_IP = 64       # 같은 IP의 동시 연결 수
+MAX_STRIKES = 50           # 제한을 연달아 이만큼 넘기면 연결을 끊음
+ROOM_QUEUE_SIZE = 64       # 방 하나에 쌓아 둘 수 있는 처리 대기 메시지 수 (가득 차면 사람 좌석의 읽기를 멈춤)
+RATE_LIMIT_EXEMPT = ()     # 제한을 적용하지 않을 IP (부하 테스트용)
+HANDSHAKE_TIMEOUT = 10.0   # 접속 후 이름을 보내기까지 기다리는 시간(초)
+MAX_TRACKED_IPS = 10000    # 기록해 둘 IP 수 (가득 차면 쉬고 있는 IP를 정리하고, 그래도 차 있으면 새 IP는 거절)
+PRUNE_INTERVAL = 1.0       # IP 기록 정리(전체 순회)를 최소 몇 초 간격으로 할지
+
+# 재접속 / 무중단 재시작
+RESUME_GRACE = 5.0         # 연결이 끊긴 뒤 봇이 자리를 이어받기까지 기다리는 시간(초)
+ROUND_DEADLINE = 30.0      # 라운드마다 입력을 기다리는 시간(초). 지나면 경매는 포기, 배틀은 첫 번째 카드로 처리 (0 이하면 끔)
+SNAPSHOT_PATH = "server.snapshot"
+RESUME_ATTEMPTS = 5        # 클라이언트가 재접속을 시도하는 횟수 (1초 간격)
+
+# 경매 덱 설정
+# - weights: 카드별 가중치 (뽑힐 확률은 가중치 / 전체 합)
+# - tiers: 희귀도별 가중치. 있으면 weights는 희귀도마다 따로 적고, 희귀도를 먼저 고른 뒤 그 안에서 카드를 고르는 것과 같은 확률이 됩니다.
+# - replacement: False면 비복원 추출. 가중치가 곧 장수이며 (희귀도 가중치는 쓰지 않음), 다 뽑으면 경매가 끝납니다.
+AUCTION_DECKS = {
+    "standard": {"weights": {"가위": 1, "바위": 1, "보": 1}},
+    "event": {
+        "tiers": {"일반": 80, "희귀": 18, "전설": 2},
+        "weights": {
+            "일반": {"가위": 1, "바위": 1, "보": 1},
+            "희귀": {"바위": 2, "보": 1},
+            "전설": {"가위": 1},
+        },
+    },
+    "limited": {"weights": {"가위": 5, "바위": 5, "보": 5}, "replacement": False},
+}
+AUCTION_DECK = "standard"
+LOT_PREFETCH = 8           # 방마다 미리 뽑아 둘 경매 카드 수
@@ -0,0 +1,98 @@
+# snapshot.py
+"""
+무중단 재시작용 스냅샷과 소켓 전달:
+- 서버 상태(방, 대기실, 세션 토큰)는 기본 자료형으로만 이루어진 딕셔너리로 만들어 pickle로 저장합니다.
+- 리스닝 소켓과 클라이언트 소켓은 유닉스 도메인 소켓의 fd 전달(SCM_RIGHTS)로 새 프로세스에 넘깁니다.
+- 방 상태는 경매 카드를 덱의 번호로만 적으므로, 덱/규칙 설정의 지문(rulecache.fingerprint)을 함께 적고
+  설정이 다른 프로세스는 스냅샷을 읽지 않습니다. 인계 요청에도 지문을 실어 보내서,
+  이전 프로세스가 종료하기 전에 거절할 수 있게 합니다.
+"""
+import contextlib
+import gc
+import os
+import pickle
+import socket
+import rulecache
+
+SNAPSHOT_VERSION = 5
+MAX_FDS_PER_MESSAGE = 250  # 리눅스의 SCM_MAX_FD(253)보다 작게
+
+
+@contextlib.contextmanager
+def paused_gc():
+    """
+    방 수만 개를 한꺼번에 만들거나 읽을 때는 새 객체가 계속 늘어나기만 하므로
+    순환 참조 수집기가 돌아도 회수할 것이 없고 시간만 듭니다. 그동안 잠시 끕니다.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def save(path, state):
+    """스냅샷을 임시 파일에 쓴 뒤 한 번에 교체 (소유자만 읽을 수 있게 저장)"""
+    state["version"] = SNAPSHOT_VERSION
+    state["rules"] = rulecache.fingerprint()
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f, paused_gc():
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def load(path):
+    with open(path, "rb") as f, paused_gc():
+        state = pickle.load(f)
+    if state.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"지원하지 않는 스냅샷 버전입니다: {state.get('version')}")
+    if state.get("rules") != rulecache.fingerprint():
+        raise ValueError("스냅샷을 만든 서버와 덱/규칙 설정이 다릅니다. 같은 settings.py로 실행하세요.")
+    return state
+
+
+def compatibility():
+    """인계 요청에 실어 보내는 "스냅샷 버전:설정 지문" 문자열"""
+    return f"{SNAPSHOT_VERSION}:{rulecache.fingerprint()}"
+
+
+def send_fds(conn, fds):
+    """fd 목록을 순서대로 나누어 전송 (1바이트 메시지마다 최대 MAX_FDS_PER_MESSAGE개)"""
+    for i in range(0, len(fds), MAX_FDS_PER_MESSAGE):
+        socket.send_fds(conn, [b"F"], fds[i:i + MAX_FDS_PER_MESSAGE])
+
+
+def request_takeover(control_path):
+    """
+    이전 서버 프로세스에 인계를 요청하고 fd 목록을 받음.
+    이전 프로세스는 스냅샷을 먼저 저장하고 fd를 모두 보낸 뒤 연결을 닫습니다.
+    스냅샷 버전이나 설정 지문이 다르면 이전 프로세스는 "R"만 보내고 그대로 계속 실행합니다.
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.connect(control_path)
+    conn.sendall(f"TAKEOVER:{compatibility()}\n".encode())
+    fds = []
+    while True:
+        msg, received, _, _ = socket.recv_fds(conn, 1, MAX_FDS_PER_MESSAGE)
+        if not msg:
+            break
+        if msg != b"F":
+            conn.close()
+            raise ValueError("이전 서버와 스냅샷 버전 또는 덱/규칙 설정이 달라 인계가 거절되었습니다. "
+                             "(이전 서버는 계속 실행 중)")
+        fds.extend(received)
+    conn.close()
+    return fds
+
+
+def request_snapshot(control_path):
+    """fd 전달 없이 스냅샷만 저장하고 종료하도록 요청 (클라이언트는 RESUME으로 다시 접속)"""
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.connect(control_path)
+    conn.sendall(b"SNAPSHOT\n")
+    conn.recv(1)
+    conn.close()
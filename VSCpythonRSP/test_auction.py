@@ -0,0 +1,147 @@
+# test_auction.py
+"""
+경매 정산/대진표/덱 테스트 (python -m pytest -q)
+"""
+import itertools
+import random
+import pytest
+import settings
+from auction import AliasTable, AuctionDeck, resolve_batch_bids, resolve_sealed_bids, round_robin_pairings
+
+
+# ---------------- 봉인 입찰 ----------------
+
+def test_first_price_pays_own_bid():
+    assert resolve_sealed_bids([150, 300, 200], "first") == (1, 300)
+
+
+def test_second_price_pays_runner_up():
+    assert resolve_sealed_bids([300, 200, 250], "second") == (0, 250)
+
+
+def test_second_price_single_bidder_pays_reserve():
+    assert resolve_sealed_bids([0, 180, 0], "second", reserve=100) == (1, 100)
+
+
+def test_bids_below_reserve_are_passes():
+    # 최소 입찰가 미만은 포기이므로 낙찰자가 없음
+    assert resolve_sealed_bids([50, 99], "second", reserve=100) == (None, 0)
+    # 차순위가 최소 입찰가 미만이면 포기로 보고 reserve를 지불
+    assert resolve_sealed_bids([150, 40], "second", reserve=100) == (0, 100)
+    assert resolve_sealed_bids([150, 120], "second", reserve=100) == (0, 120)
+    # 첫 가격 경매에서도 최소 입찰가 미만은 낙찰되지 않음
+    assert resolve_sealed_bids([60, 0], "first", reserve=100) == (None, 0)
+
+
+def test_no_valid_bids():
+    assert resolve_sealed_bids([0, 0, -5], "first") == (None, 0)
+    assert resolve_sealed_bids([], "second") == (None, 0)
+
+
+def test_ties_follow_rotating_priority():
+    bids = [200, 200, 200]
+    assert [resolve_sealed_bids(bids, "first", priority=p)[0] for p in range(4)] == [0, 1, 2, 0]
+    # 우선권 좌석이 동률에 없으면 그 다음 좌석부터
+    assert resolve_sealed_bids([0, 150, 150], "first", priority=0) == (1, 150)
+    assert resolve_sealed_bids([150, 0, 150], "first", priority=1) == (2, 150)
+
+
+def test_second_price_tie_pays_tied_bid():
+    assert resolve_sealed_bids([150, 150], "second", reserve=100, priority=1) == (1, 150)
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        resolve_sealed_bids([100], "third")
+
+
+def test_batch_settles_each_lot_and_rotates_priority():
+    results = resolve_batch_bids([[100, 100], [100, 100]], "first", priority=0)
+    assert results == [(0, 100), (1, 100)]
+    results = resolve_batch_bids([[300, 0, 150], [200, 250, 0]], "second", reserve=100)
+    assert results == [(0, 200), (1, 100), (0, 100)]
+
+
+# ---------------- 라운드 로빈 ----------------
+
+@pytest.mark.parametrize("count", range(2, 9))
+def test_round_robin_every_pair_meets_once(count):
+    seats = list(range(count))
+    rounds = round_robin_pairings(seats)
+    met = [frozenset(pair) for pairs in rounds for pair in pairs]
+    assert sorted(met, key=sorted) == sorted(
+        (frozenset(pair) for pair in itertools.combinations(seats, 2)), key=sorted)
+    # 한 라운드에 같은 좌석이 두 번 나오지 않음
+    for pairs in rounds:
+        playing = [seat for pair in pairs for seat in pair]
+        assert len(playing) == len(set(playing))
+
+
+def test_round_robin_keeps_seat_numbers():
+    rounds = round_robin_pairings([1, 4, 6])
+    assert {seat for pairs in rounds for pair in pairs for seat in pair} == {1, 4, 6}
+
+
+# ---------------- 별칭 표 / 덱 ----------------
+
+def alias_probabilities(table):
+    """표에서 각 칸이 뽑힐 정확한 확률"""
+    n = len(table.prob)
+    result = [0.0] * n
+    for i in range(n):
+        result[i] += table.prob[i] / n
+        result[table.alias[i]] += (1.0 - table.prob[i]) / n
+    return result
+
+
+@pytest.mark.parametrize("weights", [[1, 1, 1], [5, 1], [80, 18, 2], [0, 3, 1, 0, 6], [1e-6, 1, 1000]])
+def test_alias_table_probabilities(weights):
+    expected = [w / sum(weights) for w in weights]
+    assert alias_probabilities(AliasTable(weights)) == pytest.approx(expected, abs=1e-12)
+
+
+def test_alias_table_draws_match_weights():
+    table = AliasTable([6, 3, 1])
+    draws = table.draw_batch(20000, random.Random(7))
+    counts = [draws.count(i) / len(draws) for i in range(3)]
+    assert counts == pytest.approx([0.6, 0.3, 0.1], abs=0.02)
+
+
+def test_alias_table_rejects_empty_weights():
+    with pytest.raises(ValueError):
+        AliasTable([])
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+
+def test_event_deck_tier_shares():
+    config = settings.AUCTION_DECKS["event"]
+    deck = AuctionDeck(config["weights"], config["tiers"], True, "event")
+    by_tier = {}
+    for lot, p in zip(deck.lots, alias_probabilities(deck.table)):
+        by_tier[lot.tier] = by_tier.get(lot.tier, 0.0) + p
+    total = sum(config["tiers"].values())
+    assert by_tier == pytest.approx({tier: w / total for tier, w in config["tiers"].items()})
+
+
+def test_limited_deck_pile_holds_every_card_once():
+    config = settings.AUCTION_DECKS["limited"]
+    deck = AuctionDeck(config["weights"], replacement=False, name="limited")
+    pile = deck.new_pile(random.Random(1))
+    assert sorted(pile) == sorted(i for i, w in enumerate(deck.weights) for _ in range(w))
+
+
+def test_limited_deck_cannot_draw_directly():
+    deck = AuctionDeck({"가위": 2, "보": 1}, replacement=False, name="limited")
+    with pytest.raises(ValueError):
+        deck.draw()
+    with pytest.raises(ValueError):
+        deck.draw_batch(3)
+
+
+@pytest.mark.parametrize("replacement", [True, False])
+def test_deck_rejects_unknown_cards(replacement):
+    with pytest.raises(ValueError):
+        AuctionDeck({"가위": 1, "특별 가위": 1}, replacement=replacement)
+    with pytest.raises(ValueError):
+        AuctionDeck({"일반": {"바위": 1}, "희귀": {"돌": 1}}, {"일반": 9, "희귀": 1}, replacement)
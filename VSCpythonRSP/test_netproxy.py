@@ -0,0 +1,34 @@
+# test_netproxy.py
+"""
+장애 흉내 프록시 테스트 (python -m pytest -q)
+"""
+import asyncio
+from netproxy import Impairment, NetProxy
+
+
+def test_bandwidth_limit_stops_reading_from_the_sender():
+    payload = b"x" * (4 * 1024 * 1024)
+
+    async def run():
+        received = []
+
+        async def sink(reader, writer):
+            received.append(len(await reader.read()))
+            writer.close()
+
+        upstream = await asyncio.start_server(sink, "127.0.0.1", 0)
+        proxy = NetProxy("127.0.0.1", upstream.sockets[0].getsockname()[1],
+                         Impairment(bandwidth=64 * 1024))
+        port = await proxy.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(payload)
+        await asyncio.sleep(0.5)
+        # 0.5초 동안 64KB/s로 보낼 수 있는 만큼만 읽고 나머지는 보내는 쪽 소켓 버퍼에 남아 있어야 함
+        read = proxy.bytes
+        writer.transport.abort()
+        await proxy.close()
+        upstream.close()
+        await upstream.wait_closed()
+        return read
+
+    assert asyncio.run(run()) <= 4 * 65536
@@ -0,0 +1,71 @@
+# test_protocol.py
+"""
+메시지 형식 테스트 (python -m pytest -q)
+"""
+import asyncio
+from protocol import CARD_TYPES, LineBuffer, decode_counts, encode, encode_batch, encode_counts, split_frame
+from server import ClientSeat, GameServer
+
+
+def test_counts_round_trip():
+    names = ["보", "가위", "보", "보", "바위"]
+    assert encode_counts(names) == "1,1,3"
+    assert decode_counts(encode_counts(names)) == {"가위": 1, "바위": 1, "보": 3}
+    assert decode_counts(encode_counts([])) == dict.fromkeys(CARD_TYPES, 0)
+
+
+def test_line_buffer_joins_split_chunks():
+    buffer = LineBuffer()
+    data = encode("BID:150") + encode("CARD:가위")
+    # 한글(여러 바이트) 중간에서 잘려도 줄이 완성된 뒤에만 꺼냄
+    cut = len(encode("BID:150")) + 6
+    assert buffer.feed(data[:3]) == []
+    assert buffer.feed(data[3:cut]) == ["BID:150"]
+    assert buffer.feed(data[cut:]) == ["CARD:가위"]
+
+
+def test_batch_frame_round_trip():
+    messages = ["AUCTION_RESULT:WIN:150", "AUCTION_CARD:보"]
+    frame = encode_batch(messages)
+    assert frame.count(b"\n") == 1
+    assert split_frame(LineBuffer().feed(frame)[0]) == messages
+    assert split_frame("GAME_OVER:a") == ["GAME_OVER:a"]
+
+
+class FakeWriter:
+    """보낸 바이트를 프레임 단위로 모아 두는 StreamWriter 대용"""
+    def __init__(self):
+        self.frames = []
+
+    def write(self, data):
+        self.frames.append(data)
+
+    def is_closing(self):
+        return False
+
+    def close(self):
+        pass
+
+
+def test_pipeline_seat_gets_result_and_next_prompt_in_one_frame():
+    asyncio.run(pipeline_round())
+
+
+async def pipeline_round():
+    """방 시작과 경매 한 라운드에서 좌석마다 받은 프레임 확인 (서버처럼 이벤트 루프 안에서)"""
+    server = GameServer(room_size=2, bot_wait=-1)
+    piped, plain = FakeWriter(), FakeWriter()
+    seats = [ClientSeat("a", piped, pipeline=True), ClientSeat("b", plain)]
+    server.start_room(seats)
+    # 시작: 토큰, 상대 정보, 첫 경매 카드가 파이프라인 좌석에는 한 프레임으로 감
+    assert len(piped.frames) == 1 and len(plain.frames) == 3
+    session = seats[0].session
+    piped.frames.clear()
+    plain.frames.clear()
+    session.room.handle(0, "BID:0")
+    session.room.handle(1, "BID:0")
+    session.flush()
+    (frame,) = piped.frames
+    messages = split_frame(LineBuffer().feed(frame)[0])
+    assert [message.split(":")[0] for message in messages] == ["AUCTION_RESULT", "AUCTION_CARD"]
+    assert [LineBuffer().feed(data)[0] for data in plain.frames] == messages
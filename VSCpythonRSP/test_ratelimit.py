@@ -0,0 +1,129 @@
+# test_ratelimit.py
+"""
+연결/메시지 수신 제한 테스트 (python -m pytest -q)
+"""
+import asyncio
+import time
+import pytest
+import settings
+from ratelimit import SourceLimits, TokenBucket
+from server import ClientSeat, GameServer
+
+
+def elapse(bucket, seconds):
+    """토큰 버킷의 시계를 seconds초 앞으로 돌린 것처럼 만듦"""
+    bucket.stamp -= seconds
+
+
+def test_bucket_allows_burst_then_refuses():
+    bucket = TokenBucket(10, 3)
+    assert [bucket.allow() for _ in range(4)] == [True, True, True, False]
+    assert bucket.wait_time() == pytest.approx(0.1, abs=0.01)
+
+
+def test_bucket_refills_at_rate_up_to_burst():
+    bucket = TokenBucket(10, 5)
+    while bucket.allow():
+        pass
+    elapse(bucket, 0.3)
+    assert sum(bucket.allow() for _ in range(10)) == 3
+    elapse(bucket, 100)
+    assert sum(bucket.allow() for _ in range(10)) == 5
+
+
+def test_source_is_idle_only_without_connections_and_with_full_buckets():
+    source = SourceLimits(settings)
+    assert source.is_idle()
+    source.active = 1
+    assert not source.is_idle()
+    source.active = 0
+    source.messages.allow()
+    assert not source.is_idle()
+
+
+def test_admit_limits_concurrent_connections(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_CONN_PER_IP", 3)
+    server = GameServer()
+    assert [server.admit("10.0.0.1")[0] for _ in range(4)] == [True, True, True, False]
+    # 연결 하나가 끝나면 다시 받음
+    server.sources["10.0.0.1"].active -= 1
+    assert server.admit("10.0.0.1")[0]
+    # 다른 IP는 따로 셈
+    assert server.admit("10.0.0.2")[0]
+
+
+def test_admit_limits_new_connection_rate(monkeypatch):
+    monkeypatch.setattr(settings, "IP_CONN_BURST", 2)
+    server = GameServer()
+    allowed = []
+    for _ in range(3):
+        ok, source = server.admit("10.0.0.3")
+        allowed.append(ok)
+        if source is not None:
+            source.active -= 1
+    assert allowed == [True, True, False]
+
+
+def test_exempt_ip_is_not_limited():
+    server = GameServer()
+    server.exempt.add("127.0.0.1")
+    assert all(server.admit("127.0.0.1") == (True, None) for _ in range(settings.IP_CONN_BURST * 2))
+
+
+def test_throttle_waits_once_the_burst_is_spent():
+    server = GameServer()
+    client = ClientSeat("a", None)
+    delays = [server.throttle(client) for _ in range(settings.MSG_BURST + 1)]
+    assert delays[:-1] == [0] * settings.MSG_BURST
+    assert delays[-1] == pytest.approx(1 / settings.MSG_RATE, rel=0.1)
+
+
+def test_throttle_charges_the_shared_ip_bucket():
+    server = GameServer()
+    _, source = server.admit("10.0.0.4")
+    clients = [ClientSeat(f"c{i}", None, source) for i in range(settings.IP_MSG_BURST // settings.MSG_BURST + 1)]
+    delays = [server.throttle(client) for client in clients for _ in range(settings.MSG_BURST)]
+    assert delays[:settings.IP_MSG_BURST] == [0] * settings.IP_MSG_BURST
+    assert delays[settings.IP_MSG_BURST] > 0
+
+
+def test_ip_limit_does_not_charge_the_connection_bucket():
+    server = GameServer()
+    _, source = server.admit("10.0.0.5")
+    source.messages.tokens = 0
+    client = ClientSeat("a", None, source)
+    assert server.throttle(client) > 0
+    assert client.bucket.tokens == pytest.approx(settings.MSG_BURST)
+
+
+def test_flood_is_processed_at_the_configured_rate(monkeypatch):
+    """기다린 뒤에도 토큰을 써야 넘어가므로 몰아 보내도 처리 속도는 rate를 넘지 않음"""
+    monkeypatch.setattr(settings, "MSG_RATE", 200)
+    monkeypatch.setattr(settings, "MSG_BURST", 10)
+    monkeypatch.setattr(settings, "MAX_STRIKES", 1000)
+    server = GameServer()
+    client = ClientSeat("a", None)
+
+    async def flood(count):
+        started = time.monotonic()
+        for _ in range(count):
+            await server.take_message_token(client)
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(flood(70))
+    assert elapsed >= (70 - 10) / 200 * 0.95
+
+
+def test_sustained_flood_is_disconnected(monkeypatch):
+    monkeypatch.setattr(settings, "MSG_RATE", 1000)
+    monkeypatch.setattr(settings, "MSG_BURST", 2)
+    monkeypatch.setattr(settings, "MAX_STRIKES", 3)
+    server = GameServer()
+    client = ClientSeat("a", None)
+
+    async def flood():
+        for _ in range(10):
+            await server.take_message_token(client)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(flood())
@@ -0,0 +1,115 @@
+# test_room.py
+"""
+게임 방 진행/스냅샷 테스트 (python -m pytest -q)
+"""
+import pickle
+import random
+import pytest
+import settings
+from protocol import decode_counts
+from room import GameRoom
+
+
+def play_with_bids(room, rng):
+    """라운드 하나를 임의의 입찰/카드로 진행"""
+    for seat, kind in list(room.waiting.items()):
+        points = room.players[seat].points
+        if kind == "BIDS":
+            bids = [rng.choice([0, settings.MIN_BID]) for _ in room.current_lots]
+            if sum(bids) > points:
+                bids = [0] * len(bids)
+            room.handle(seat, "BIDS:" + ",".join(map(str, bids)))
+        elif kind == "BID":
+            room.handle(seat, f"BID:{rng.randint(0, points)}")
+        else:
+            # 복원한 방은 카드 순서가 다를 수 있으므로 이름 순으로 골라 같은 난수면 같은 카드를 냄
+            room.handle(seat, f"CARD:{rng.choice(sorted(card.name for card in room.players[seat].cards))}")
+
+
+def test_battle_deltas_track_opponent_counts():
+    """
+    상대가 그대로면 BATTLE_START에 장수가 오지 않으므로, 클라이언트처럼
+    결과 메시지로 상대 장수를 갱신한 값이 실제 장수와 같은지 확인
+    """
+    inbox = {seat: [] for seat in range(3)}
+    room = GameRoom(["a", "b", "c"], lambda seat, message: inbox[seat].append(message))
+    rng = random.Random(5)
+    views = {}
+    room.start()
+    checked = 0
+    while not room.finished:
+        play_with_bids(room, rng)
+        for seat, messages in inbox.items():
+            for message in messages:
+                fields = message.split(":")
+                if fields[0] == "BATTLE_START":
+                    if len(fields) > 3:
+                        views[seat] = decode_counts(fields[2])
+                    opponent = room.opponent_of(seat)
+                    assert views[seat] == decode_counts(room.card_counts(opponent))
+                    checked += 1
+                elif fields[0] == "BATTLE_RESULT" and fields[1] == "WIN":
+                    views[seat][fields[3]] -= 1
+            messages.clear()
+    assert checked > 0
+
+
+def reload(room, send):
+    """서버의 인계처럼 스냅샷을 pickle로 거쳐 복원 (원래 방과 객체를 함께 쓰지 않게)"""
+    return GameRoom.restore(pickle.loads(pickle.dumps(room.snapshot())), send)
+
+
+@pytest.mark.parametrize("deck,batch,players", [
+    ("standard", 1, 2), ("event", 3, 3), ("limited", 1, 4), ("limited", 2, 3),
+])
+def test_room_snapshot_round_trip(deck, batch, players):
+    rng = random.Random(deck + str(batch))
+    room = GameRoom([f"p{i}" for i in range(players)], lambda seat, message: None,
+                    "second", deck, batch)
+    room.start()
+    while True:
+        restored = reload(room, lambda seat, message: None)
+        assert restored.snapshot() == room.snapshot()
+        if room.finished:
+            break
+        play_with_bids(room, rng)
+    assert room.phase == "GAME_OVER"
+
+
+def test_restored_room_plays_the_same():
+    sent = []
+    room = GameRoom(["a", "b"], lambda seat, message: sent.append((seat, message)))
+    room.start()
+    for _ in range(3):
+        play_with_bids(room, random.Random(1))
+    restored_sent = []
+    restored = reload(room, lambda seat, message: restored_sent.append((seat, message)))
+    sent.clear()
+    # 입찰과 (미리 뽑아 두지 않은) 경매 카드를 같은 난수로 정함
+    for target in (room, restored):
+        rng = random.Random(2)
+        random.seed(11)
+        while not target.finished:
+            play_with_bids(target, rng)
+    assert restored_sent == sent
+    assert restored.snapshot() == room.snapshot()
+
+
+def test_expire_passes_and_plays_first_card():
+    sent = []
+    room = GameRoom(["a", "b"], lambda seat, message: sent.append((seat, message)))
+    room.start()
+    assert room.expire() == [0, 1]
+    assert room.auction_round == 1
+    assert [p.points for p in room.players] == [settings.INITIAL_POINTS] * 2
+    # 한 좌석만 답하지 않은 경우: 답한 좌석의 입력은 그대로 씀
+    room.handle(0, f"BID:{settings.MIN_BID}")
+    assert room.expire() == [1]
+    assert room.players[0].points == settings.INITIAL_POINTS - settings.MIN_BID
+    while room.phase != "BATTLE":
+        room.expire()
+    seat = next(iter(room.waiting))
+    first = room.players[seat].cards[0].name
+    room.expire()
+    assert any(message.startswith("BATTLE_RESULT:") and message.split(":")[2] == first
+               for target, message in sent if target == seat)
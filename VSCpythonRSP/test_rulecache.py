@@ -0,0 +1,62 @@
+# test_rulecache.py
+"""
+규칙 캐시(rules.bin) 테스트 (python -m pytest -q)
+"""
+import random
+import rulecache
+import settings
+from auction import AliasTable, AuctionDeck
+from protocol import CARD_TYPES
+from room import BEATS
+
+
+def test_cache_round_trip(tmp_path):
+    path = str(tmp_path / "rules.bin")
+    rulecache.build(path)
+    cache = rulecache.load(path)
+    assert cache is not None
+    for name, config in settings.AUCTION_DECKS.items():
+        if not config.get("replacement", True):
+            assert name not in cache.tables
+            continue
+        table = AuctionDeck(config["weights"], config.get("tiers"), True, name).table
+        prob, alias = cache.tables[name]
+        assert list(prob) == table.prob
+        assert list(alias) == table.alias
+
+
+def test_matchup_table():
+    matchup = rulecache.build_matchup()
+    n = len(CARD_TYPES)
+    for i, mine in enumerate(CARD_TYPES):
+        for j, theirs in enumerate(CARD_TYPES):
+            expected = 1 if BEATS[mine] == theirs else -1 if BEATS[theirs] == mine else 0
+            assert matchup[i * n + j] == expected
+
+
+def test_stale_or_broken_cache_is_ignored(tmp_path):
+    path = str(tmp_path / "rules.bin")
+    rulecache.build(path)
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    # 지문이 다르면 (설정이 바뀐 뒤의 캐시) 쓰지 않음
+    data[8] ^= 0xFF
+    stale = str(tmp_path / "stale.bin")
+    with open(stale, "wb") as f:
+        f.write(data)
+    assert rulecache.load(stale) is None
+    broken = str(tmp_path / "broken.bin")
+    with open(broken, "wb") as f:
+        f.write(data[:5])
+    assert rulecache.load(broken) is None
+    assert rulecache.load(str(tmp_path / "missing.bin")) is None
+
+
+def test_table_from_cache_draws_like_computed(tmp_path):
+    path = str(tmp_path / "rules.bin")
+    rulecache.build(path)
+    prob, alias = rulecache.load(path).tables["event"]
+    config = settings.AUCTION_DECKS["event"]
+    table = AuctionDeck(config["weights"], config["tiers"], True, "event").table
+    cached = AliasTable.from_arrays(prob, alias)
+    assert cached.draw_batch(200, random.Random(4)) == table.draw_batch(200, random.Random(4))
@@ -0,0 +1,34 @@
+# test_server.py
+"""
+서버 설정 검사 테스트 (python -m pytest -q)
+"""
+import pytest
+import settings
+from server import GameServer, parse_args
+
+
+@pytest.mark.parametrize("room_size", [0, 1, settings.MAX_ROOM_SIZE + 1])
+def test_room_size_out_of_range_is_rejected(room_size):
+    with pytest.raises(ValueError):
+        GameServer(room_size=room_size)
+    with pytest.raises(SystemExit):
+        parse_args(["--room-size", str(room_size)])
+
+
+def test_room_size_in_range_is_accepted():
+    assert parse_args(["--room-size", "2"]).room_size == 2
+    assert GameServer(room_size=settings.MAX_ROOM_SIZE).room_size == settings.MAX_ROOM_SIZE
+
+
+@pytest.mark.parametrize("batch", [0, -1])
+def test_batch_below_one_is_rejected(batch):
+    with pytest.raises(ValueError):
+        GameServer(batch=batch)
+    with pytest.raises(SystemExit):
+        parse_args(["--batch", str(batch)])
+
+
+def test_unknown_bot_policy_is_rejected():
+    with pytest.raises(SystemExit):
+        parse_args(["--bot-policy", "greedy"])
+    assert parse_args(["--bot-policy", "counter"]).bot_policy == "counter"
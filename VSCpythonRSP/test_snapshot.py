@@ -0,0 +1,71 @@
+# test_snapshot.py
+"""
+무중단 재시작 스냅샷/인계 테스트 (python -m pytest -q)
+"""
+import asyncio
+import socket
+import threading
+import pytest
+import settings
+import snapshot
+from server import GameServer
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "state.pickle")
+    snapshot.save(path, {"next_room_id": 3, "rooms": [], "lobby": []})
+    assert snapshot.load(path)["next_room_id"] == 3
+
+
+def test_load_rejects_snapshot_from_other_deck_settings(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.pickle")
+    snapshot.save(path, {"next_room_id": 0, "rooms": [], "lobby": []})
+    decks = dict(settings.AUCTION_DECKS)
+    decks["standard"] = dict(decks["standard"], weights={"가위": 1, "바위": 1, "보": 2})
+    monkeypatch.setattr(settings, "AUCTION_DECKS", decks)
+    with pytest.raises(ValueError):
+        snapshot.load(path)
+
+
+@pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="fd 전달을 지원하지 않는 운영체제")
+def test_handover_refuses_mismatched_takeover_and_keeps_running(tmp_path):
+    control_path = str(tmp_path / "control.sock")
+    server = GameServer(control_path=control_path)
+
+    async def request():
+        server.open_control_socket()
+        try:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.connect(control_path)
+            conn.sendall(b"TAKEOVER:1:0\n")
+            reply = await asyncio.to_thread(conn.recv, 16)
+            conn.close()
+            return reply
+        finally:
+            server.control.close()
+
+    assert asyncio.run(request()) == b"R"
+    assert not server.frozen
+
+
+@pytest.mark.skipif(not hasattr(socket, "send_fds"), reason="fd 전달을 지원하지 않는 운영체제")
+def test_request_takeover_raises_when_refused(tmp_path):
+    control_path = str(tmp_path / "control.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(control_path)
+    listener.listen(1)
+    received = []
+
+    def old_server():
+        conn, _ = listener.accept()
+        received.append(conn.recv(64))
+        conn.sendall(b"R")
+        conn.close()
+
+    thread = threading.Thread(target=old_server)
+    thread.start()
+    with pytest.raises(ValueError):
+        snapshot.request_takeover(control_path)
+    thread.join()
+    listener.close()
+    assert received == [f"TAKEOVER:{snapshot.compatibility()}\n".encode()]